@@ -6,6 +6,7 @@ Central configuration management for the Secure Edge Vision System.
 
 This module provides:
 1. Config class - Loads and validates all system settings from environment
+   (get_config() returns a shared instance)
 2. load_preset() - Loads detection presets from presets.yaml
 3. validate_config() - Checks configuration validity
 4. show_system_info() - Displays system information (Python, CUDA, etc.)
@@ -54,6 +55,7 @@ CLI Usage:
     python config.py --info        # Show system information
     python config.py --create-env  # Create default .env file
     python config.py --template    # Print .env template
+    python config.py --validate --probe-camera  # Also test-open the camera
     
     # Preset selection:
     python main.py --preset 2
@@ -67,8 +69,11 @@ License: MIT
 import os
 import sys
 import logging
+import functools
+import importlib
+import types
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Mapping, Union
 
 from dotenv import load_dotenv
 
@@ -78,15 +83,61 @@ load_dotenv()
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Directory containing this module
+_BASE_DIR = Path(__file__).resolve().parent
+
+# Prefer the libyaml-backed loader (~10x faster than pure-Python SafeLoader)
+try:
+    import yaml
+    try:
+        from yaml import CSafeLoader as _YamlLoader
+    except ImportError:
+        from yaml import SafeLoader as _YamlLoader
+    logger.debug(f"YAML loader: {_YamlLoader.__name__}")
+except ImportError:
+    yaml = None
+    _YamlLoader = None
+
 
 # ================================================================================
 # Preset Management
 # ================================================================================
 
+# Hardcoded fallback presets (see _get_default_presets)
+_DEFAULT_PRESETS: Dict[int, Dict[str, Any]] = {
+    1: {
+        "name": "Default (YOLOv8-Face + BoT-SORT)",
+        "description": "Balanced preset for general surveillance use",
+        "detector": "yolov8n-face",
+        "tracker": "botsort",
+        "confidence": 0.35,
+        "iou": 0.45
+    },
+    2: {
+        "name": "Alternative (YOLOv11-Face + ByteTrack)",
+        "description": "Experimental preset with newer detector and faster tracker",
+        "detector": "yolov11n-face",
+        "tracker": "bytetrack",
+        "confidence": 0.30,
+        "iou": 0.50
+    }
+}
+
+# Default presets location, resolved once (working directory first, then next to config.py)
+_PRESETS_PATH: Optional[Path] = next(
+    (p.resolve() for p in (Path("presets.yaml"), _BASE_DIR / "presets.yaml") if p.exists()),
+    None
+)
+
+
+@functools.lru_cache(maxsize=4)
 def load_presets(preset_file: str = "presets.yaml") -> Dict[int, Dict[str, Any]]:
     """
     Load detection presets from YAML configuration file.
     
+    Results are cached per preset_file; call reload_presets() after
+    editing the file to pick up changes.
+    
     Args:
         preset_file: Path to presets.yaml file (relative or absolute)
         
@@ -98,28 +149,29 @@ def load_presets(preset_file: str = "presets.yaml") -> Dict[int, Dict[str, Any]]
         >>> print(presets[1]["name"])
         "Default (YOLOv8-Face + BoT-SORT)"
     """
-    try:
-        import yaml
-    except ImportError:
+    if yaml is None:
         logger.warning("PyYAML not installed. Using default preset configuration.")
         return _get_default_presets()
     
-    # Try multiple paths to find presets.yaml
-    base_dir = Path(__file__).parent
-    possible_paths = [
-        Path(preset_file),  # As provided
-        base_dir / preset_file,  # Relative to config.py
-        base_dir / "presets.yaml",  # Default name in same directory
-    ]
+    if preset_file == "presets.yaml":
+        # Default file: use the path resolved at import
+        possible_paths = [_PRESETS_PATH] if _PRESETS_PATH is not None else []
+    else:
+        # Try multiple paths to find a custom presets file
+        possible_paths = [
+            Path(preset_file),  # As provided
+            _BASE_DIR / preset_file,  # Relative to config.py
+            _BASE_DIR / "presets.yaml",  # Default name in same directory
+        ]
     
     for path in possible_paths:
         if path.exists():
             try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f)
-                    if data and "presets" in data:
-                        logger.info(f"Loaded presets from: {path}")
-                        return data["presets"]
+                # Bytes straight to the loader - libyaml decodes UTF-8 itself
+                data = yaml.load(path.read_bytes(), Loader=_YamlLoader)
+                if data and "presets" in data:
+                    logger.info(f"Loaded presets from: {path}")
+                    return data["presets"]
             except Exception as e:
                 logger.warning(f"Failed to parse {path}: {e}")
     
@@ -127,30 +179,20 @@ def load_presets(preset_file: str = "presets.yaml") -> Dict[int, Dict[str, Any]]
     return _get_default_presets()
 
 
+def reload_presets():
+    """Drop cached presets so the next load re-reads presets.yaml"""
+    load_presets.cache_clear()
+    Config._presets_cache = None
+
+
 def _get_default_presets() -> Dict[int, Dict[str, Any]]:
     """
     Return hardcoded default presets as fallback.
     
     These match the presets.yaml configuration exactly.
+    The same dict is returned on every call - treat it as read-only.
     """
-    return {
-        1: {
-            "name": "Default (YOLOv8-Face + BoT-SORT)",
-            "description": "Balanced preset for general surveillance use",
-            "detector": "yolov8n-face",
-            "tracker": "botsort",
-            "confidence": 0.35,
-            "iou": 0.45
-        },
-        2: {
-            "name": "Alternative (YOLOv11-Face + ByteTrack)",
-            "description": "Experimental preset with newer detector and faster tracker",
-            "detector": "yolov11n-face",
-            "tracker": "bytetrack",
-            "confidence": 0.30,
-            "iou": 0.50
-        }
-    }
+    return _DEFAULT_PRESETS
 
 
 def get_preset(preset_id: int, presets: Optional[Dict] = None) -> Dict[str, Any]:
@@ -177,6 +219,55 @@ def get_preset(preset_id: int, presets: Optional[Dict] = None) -> Dict[str, Any]
     return presets[preset_id]
 
 
+# Map detector name (from preset) to model file path
+_DETECTOR_MODEL_MAP = types.MappingProxyType({
+    "yolov8n-face": "models/model.pt",          # YOLOv8-Face (custom trained - WIDER Face)
+    "yolov11n-face": "models/yolov11n-face.pt", # YOLOv11-Face (YapaLab - WIDER Face)
+    "yolov8n": "yolov8n.pt",                    # YOLOv8 nano COCO (auto-download)
+    "yolov11n": "yolo11n.pt"                    # YOLOv11 nano COCO (auto-download)
+})
+
+
+# Separator line for the preset banner
+_BANNER = "=" * 60
+
+
+# ================================================================================
+# Environment Helpers
+# ================================================================================
+
+def _env_int(env, key: str, default: int) -> int:
+    """Read an int from an environment mapping"""
+    value = env.get(key)
+    return int(value) if value is not None else default
+
+
+def _env_float(env, key: str, default: float) -> float:
+    """Read a float from an environment mapping"""
+    value = env.get(key)
+    return float(value) if value is not None else default
+
+
+# Values accepted as true for boolean env vars (anything else is false)
+_TRUE = frozenset({"1", "true", "True", "TRUE", "yes", "Yes", "on", "On", "t", "y"})
+
+
+def _env_bool(env, key: str, default: bool) -> bool:
+    """Read a boolean flag from an environment mapping"""
+    value = env.get(key)
+    if value is None:
+        return default
+    # Exact spellings hit the set directly; normalize only the odd ones
+    return value in _TRUE or value.strip().lower() in _TRUE
+
+
+def parse_camera_source(source: str) -> Union[int, str]:
+    """Parse one camera source: ASCII digits are a device index, anything else a URL/path"""
+    source = source.strip()
+    # isdigit() would also accept e.g. superscripts, which int() rejects
+    return int(source) if source.isascii() and source.isdecimal() else source
+
+
 class Config:
     """
     System configuration loaded from environment variables.
@@ -191,12 +282,12 @@ class Config:
         model_path (str): Path to YOLOv8 model file
         confidence (float): Detection confidence threshold (0.0-1.0)
         iou (float): IoU threshold for NMS/tracking (0.0-1.0)
-        blur_intensity (int): Gaussian blur kernel size (must be odd)
+        blur_intensity (int): Gaussian blur kernel size (odd, >= 3)
         server_host (str): FastAPI server host address
         server_port (int): FastAPI server port
-        public_path (str): Directory for public (blurred) recordings
-        evidence_path (str): Directory for encrypted evidence
-        key_path (str): Path to encryption key file
+        public_path (Path): Directory for public (blurred) recordings
+        evidence_path (Path): Directory for encrypted evidence
+        key_path (Path): Path to encryption key file
         target_fps (int): Target frames per second for recording
         max_duration (int): Maximum recording duration before rotation
         evidence_detection_only (bool): Only save evidence with detections
@@ -217,120 +308,131 @@ class Config:
         >>> print(f"Detector: {config.detector}")
     """
     
-    def __init__(self, preset_id: Optional[int] = None):
+    __slots__ = (
+        "preset_id", "preset_name", "detector", "tracker",
+        "camera_sources", "device", "model_path", "confidence", "iou", "blur_intensity",
+        "server_host", "server_port",
+        "public_path", "evidence_path", "key_path",
+        "target_fps", "max_duration",
+        "evidence_detection_only", "evidence_quality",
+        "max_storage_gb",
+        "show_timestamp", "show_debug_overlay",
+    )
+    
+    # Presets shared by all instances (filled on first construction)
+    _presets_cache: Optional[Dict[int, Dict[str, Any]]] = None
+    
+    def __init__(self, preset_id: Optional[int] = None,
+                 env: Optional[Mapping[str, str]] = None):
         """
         Initialize configuration with optional preset override.
         
         Args:
             preset_id: Override preset ID. If None, reads from DETECTION_PRESET env var
                        or defaults to 1.
+            env: Environment snapshot to read settings from. Defaults to the
+                 live os.environ (CLI overrides in main.py are written there
+                 just before Config is built, so it is not snapshotted at import).
         """
+        if env is None:
+            env = os.environ
+        
         # ====================================================================
         # Preset Loading (Priority: CLI arg > env var > default)
         # ====================================================================
         if preset_id is None:
-            preset_id = int(os.getenv("DETECTION_PRESET", "1"))
+            preset_id = _env_int(env, "DETECTION_PRESET", 1)
         
-        # Validate preset ID
-        if preset_id not in (1, 2):
+        # Load preset configuration (parsed once, shared across instances)
+        if Config._presets_cache is None:
+            Config._presets_cache = load_presets()
+        presets = Config._presets_cache
+        
+        # Validate preset ID (single check - fall back to preset 1)
+        if preset_id not in presets:
             logger.warning(f"Invalid preset {preset_id}, using preset 1")
             preset_id = 1
         
         self.preset_id = preset_id
-        
-        # Load preset configuration
-        presets = load_presets()
-        preset = get_preset(preset_id, presets)
+        preset = presets[preset_id]
         
         # Store preset attributes
         self.preset_name = preset.get("name", f"Preset {preset_id}")
         self.detector = preset.get("detector", "yolov8n-face")
         self.tracker = preset.get("tracker", "botsort")
         
-        # Log preset loading
-        logger.info("=" * 60)
-        logger.info(f"LOADING DETECTION PRESET {preset_id}")
-        logger.info("=" * 60)
-        logger.info(f"  Name: {self.preset_name}")
-        logger.info(f"  Detector: {self.detector}")
-        logger.info(f"  Tracker: {self.tracker}")
-        logger.info(f"  Confidence: {preset.get('confidence', 0.35)}")
-        logger.info(f"  IoU: {preset.get('iou', 0.45)}")
-        logger.info("=" * 60)
+        # Log preset loading (one record for the whole banner)
+        logger.info(
+            f"\n{_BANNER}\n"
+            f"LOADING DETECTION PRESET {preset_id}\n"
+            f"{_BANNER}\n"
+            f"  Name: {self.preset_name}\n"
+            f"  Detector: {self.detector}\n"
+            f"  Tracker: {self.tracker}\n"
+            f"  Confidence: {preset.get('confidence', 0.35)}\n"
+            f"  IoU: {preset.get('iou', 0.45)}\n"
+            f"{_BANNER}"
+        )
         
         # ====================================================================
         # Camera Sources
         # ====================================================================
-        sources_str = os.getenv("CAMERA_SOURCES", "0")
-        self.camera_sources = []
-        for src in sources_str.split(","):
-            src = src.strip()
-            if src.isdigit():
-                self.camera_sources.append(int(src))
-            else:
-                self.camera_sources.append(src)
+        sources_str = env.get("CAMERA_SOURCES", "0")
+        self.camera_sources = [parse_camera_source(src) for src in sources_str.split(",")]
         
         # ====================================================================
         # Detection Settings (from preset, with env var override)
         # ====================================================================
-        self.device = os.getenv("DEVICE", "cuda")
-        
-        # Map detector name to model file path
-        # If detector is specified in preset, use corresponding model
-        detector_model_map = {
-            "yolov8n-face": "models/model.pt",          # YOLOv8-Face (custom trained - WIDER Face)
-            "yolov11n-face": "models/yolov11n-face.pt", # YOLOv11-Face (YapaLab - WIDER Face)
-            "yolov8n": "yolov8n.pt",                    # YOLOv8 nano COCO (auto-download)
-            "yolov11n": "yolo11n.pt"                    # YOLOv11 nano COCO (auto-download)
-        }
+        self.device = env.get("DEVICE", "cuda")
         
         # Determine model path based on detector from preset
-        default_model = detector_model_map.get(self.detector, "models/model.pt")
-        self.model_path = os.getenv("MODEL_PATH", default_model)
+        default_model = _DETECTOR_MODEL_MAP.get(self.detector, "models/model.pt")
+        self.model_path = env.get("MODEL_PATH", default_model)
         
         # Log which model will be used
         logger.info(f"  Model Path: {self.model_path}")
         
         # Use preset values as defaults, allow env var override
-        self.confidence = float(os.getenv("DETECTION_CONFIDENCE", str(preset.get("confidence", 0.35))))
-        self.iou = float(os.getenv("DETECTION_IOU", str(preset.get("iou", 0.45))))
-        self.blur_intensity = int(os.getenv("BLUR_INTENSITY", "51"))
+        self.confidence = _env_float(env, "DETECTION_CONFIDENCE", float(preset.get("confidence", 0.35)))
+        self.iou = _env_float(env, "DETECTION_IOU", float(preset.get("iou", 0.45)))
+        # Gaussian kernels must be odd - round even values up once here
+        self.blur_intensity = max(3, _env_int(env, "BLUR_INTENSITY", 51) | 1)
         
         # ====================================================================
         # Server Settings
         # ====================================================================
-        self.server_host = os.getenv("SERVER_HOST", "0.0.0.0")
-        self.server_port = int(os.getenv("SERVER_PORT", "8000"))
+        self.server_host = env.get("SERVER_HOST", "0.0.0.0")
+        self.server_port = _env_int(env, "SERVER_PORT", 8000)
         
         # ====================================================================
         # Storage Paths
         # ====================================================================
-        self.public_path = os.getenv("PUBLIC_RECORDINGS_PATH", "recordings/public")
-        self.evidence_path = os.getenv("EVIDENCE_RECORDINGS_PATH", "recordings/evidence")
-        self.key_path = os.getenv("ENCRYPTION_KEY_PATH", "keys/master.key")
+        self.public_path = Path(env.get("PUBLIC_RECORDINGS_PATH", "recordings/public"))
+        self.evidence_path = Path(env.get("EVIDENCE_RECORDINGS_PATH", "recordings/evidence"))
+        self.key_path = Path(env.get("ENCRYPTION_KEY_PATH", "keys/master.key"))
         
         # ====================================================================
         # Recording Settings
         # ====================================================================
-        self.target_fps = int(os.getenv("TARGET_FPS", "30"))
-        self.max_duration = int(os.getenv("RECORDING_DURATION_SECONDS", "300"))
+        self.target_fps = _env_int(env, "TARGET_FPS", 30)
+        self.max_duration = _env_int(env, "RECORDING_DURATION_SECONDS", 300)
         
         # ====================================================================
         # Storage Optimization
         # ====================================================================
-        self.evidence_detection_only = os.getenv("EVIDENCE_DETECTION_ONLY", "True").lower() == "true"
-        self.evidence_quality = int(os.getenv("EVIDENCE_JPEG_QUALITY", "75"))
+        self.evidence_detection_only = _env_bool(env, "EVIDENCE_DETECTION_ONLY", True)
+        self.evidence_quality = _env_int(env, "EVIDENCE_JPEG_QUALITY", 75)
         
         # ====================================================================
         # Retention Policy
         # ====================================================================
-        self.max_storage_gb = int(os.getenv("MAX_STORAGE_GB", "50"))
+        self.max_storage_gb = _env_int(env, "MAX_STORAGE_GB", 50)
         
         # ====================================================================
         # Overlay Settings
         # ====================================================================
-        self.show_timestamp = os.getenv("SHOW_TIMESTAMP", "True").lower() == "true"
-        self.show_debug_overlay = os.getenv("SHOW_DEBUG_OVERLAY", "False").lower() == "true"
+        self.show_timestamp = _env_bool(env, "SHOW_TIMESTAMP", True)
+        self.show_debug_overlay = _env_bool(env, "SHOW_DEBUG_OVERLAY", False)
     
     def get_preset_info(self) -> Dict[str, Any]:
         """
@@ -349,98 +451,147 @@ class Config:
         }
 
 
-def validate_config() -> Tuple[bool, List[str]]:
+def _nvml_gpu_count() -> Optional[int]:
+    """
+    Count NVIDIA GPUs through NVML (a driver query, no CUDA context).
+    
+    Returns None when pynvml or the NVIDIA driver is unavailable.
+    """
+    try:
+        import pynvml
+        pynvml.nvmlInit()
+    except Exception:
+        return None
+    try:
+        return pynvml.nvmlDeviceGetCount()
+    except Exception:
+        return None
+    finally:
+        pynvml.nvmlShutdown()
+
+
+@functools.lru_cache(maxsize=1)
+def get_config() -> Config:
+    """
+    Return the process-wide Config, built on first call.
+    
+    Apply CLI overrides to os.environ before the first call; construct
+    Config() directly when a fresh or preset-specific instance is needed.
+    """
+    return Config()
+
+
+def validate_config(config: Optional[Config] = None,
+                    probe_camera: bool = False) -> Tuple[bool, List[str]]:
     """
     Validate system configuration
+    
+    Args:
+        config: Already-loaded Config to check (defaults to get_config())
+        probe_camera: Open local camera devices to check they work (slow -
+                      initializes the capture backend). Otherwise only the
+                      /dev/videoN node is checked on Linux.
+    
     Returns: (is_valid, list_of_issues)
     """
-    # ... existing validation logic ...
+    if config is None:
+        config = get_config()
+    
     issues = []
     warnings = []
     
-    # Check camera source
-    camera = os.getenv("CAMERA_SOURCES", "0")
-    if camera.startswith("rtsp://"):
-        warnings.append(f"Using RTSP source: {camera[:50]}...")
-    elif camera.isdigit():
-        try:
-            import cv2
-            cap = cv2.VideoCapture(int(camera))
-            if not cap.isOpened():
-                issues.append(f"Cannot open camera {camera}")
-            cap.release()
-        except Exception as e:
-            issues.append(f"Camera test failed: {e}")
-    
-    # Check directories
-    for dir_var in ["PUBLIC_RECORDINGS_PATH", "EVIDENCE_RECORDINGS_PATH"]:
-        path = Path(os.getenv(dir_var, f"recordings/{dir_var.split('_')[0].lower()}"))
-        if not path.exists():
+    # Check camera sources
+    for camera in config.camera_sources:
+        if isinstance(camera, str) and camera.startswith("rtsp://"):
+            warnings.append(f"Using RTSP source: {camera[:50]}...")
+        elif isinstance(camera, int) and probe_camera:
             try:
-                path.mkdir(parents=True, exist_ok=True)
+                import cv2
+                cap = cv2.VideoCapture(camera)
+                try:
+                    if not cap.isOpened():
+                        issues.append(f"Cannot open camera {camera}")
+                finally:
+                    cap.release()
             except Exception as e:
-                issues.append(f"Cannot create {dir_var}: {e}")
+                issues.append(f"Camera test failed: {e}")
+        elif isinstance(camera, int) and sys.platform.startswith("linux"):
+            # Cheap check: device node exists (no driver initialization)
+            if not Path(f"/dev/video{camera}").exists():
+                issues.append(f"Camera device /dev/video{camera} not found")
     
-    # Check key directory
-    key_path = Path(os.getenv("ENCRYPTION_KEY_PATH", "keys/master.key"))
-    key_dir = key_path.parent
-    if not key_dir.exists():
+    # Check directories
+    for dir_var, dir_path in (("PUBLIC_RECORDINGS_PATH", config.public_path),
+                              ("EVIDENCE_RECORDINGS_PATH", config.evidence_path)):
         try:
-            key_dir.mkdir(parents=True, exist_ok=True)
-        except Exception as e:
-            issues.append(f"Cannot create key directory: {e}")
+            dir_path.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            issues.append(f"Cannot create {dir_var}: {e}")
+    
+    # Check key directory
+    try:
+        config.key_path.parent.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        issues.append(f"Cannot create key directory: {e}")
     
     # Check CUDA
-    device = os.getenv("DEVICE", "cuda")
-    if device == "cuda":
-        try:
-            import torch
-            if not torch.cuda.is_available():
-                warnings.append("CUDA requested but not available, will use CPU")
-        except ImportError:
-            warnings.append("PyTorch not installed, cannot check CUDA")
+    device = config.device
+    if device == "cuda" and os.environ.get("CUDA_VISIBLE_DEVICES") == "":
+        warnings.append("CUDA requested but CUDA_VISIBLE_DEVICES is empty, will use CPU")
+    elif device == "cuda":
+        gpu_count = _nvml_gpu_count()
+        if gpu_count == 0:
+            warnings.append("CUDA requested but no GPU found, will use CPU")
+        elif gpu_count is None:
+            # No NVML - fall back to torch (initializes a CUDA context)
+            try:
+                import torch
+                if not torch.cuda.is_available():
+                    warnings.append("CUDA requested but not available, will use CPU")
+            except ImportError:
+                warnings.append("PyTorch not installed, cannot check CUDA")
     
     # Check blur intensity
-    blur = int(os.getenv("BLUR_INTENSITY", "51"))
-    if blur % 2 == 0:
-        warnings.append(f"BLUR_INTENSITY should be odd, will use {blur + 1}")
+    blur = config.blur_intensity  # Already rounded up to odd by Config
     if blur < 11:
         warnings.append("BLUR_INTENSITY < 11 may not provide adequate privacy")
     
     # Check port
-    port = int(os.getenv("SERVER_PORT", "8000"))
+    port = config.server_port
     if port < 1024:
         warnings.append(f"Port {port} may require admin privileges")
     
-    # Print results
-    print("\n" + "=" * 50)
-    print("  CONFIGURATION VALIDATION")
-    print("=" * 50)
-    
-    print(f"\nCamera: {os.getenv('CAMERA_SOURCES', '0')}")
-    print(f"Device: {os.getenv('DEVICE', 'cuda')}")
-    print(f"Port: {os.getenv('SERVER_PORT', '8000')}")
-    print(f"Blur: {os.getenv('BLUR_INTENSITY', '51')}")
-    print(f"FPS: {os.getenv('TARGET_FPS', '30')}")
+    # Print results (collected and written in one go)
+    lines = [
+        "\n" + "=" * 50,
+        "  CONFIGURATION VALIDATION",
+        "=" * 50,
+        f"\nCamera: {','.join(map(str, config.camera_sources))}",
+        f"Device: {device}",
+        f"Port: {port}",
+        f"Blur: {blur}",
+        f"FPS: {config.target_fps}",
+    ]
     
     if warnings:
-        print(f"\n⚠️  Warnings ({len(warnings)}):")
-        for w in warnings:
-            print(f"   • {w}")
+        lines.append(f"\n⚠️  Warnings ({len(warnings)}):")
+        lines.extend(f"   • {w}" for w in warnings)
     
     if issues:
-        print(f"\n❌ Issues ({len(issues)}):")
-        for i in issues:
-            print(f"   • {i}")
-        return False, issues
+        lines.append(f"\n❌ Issues ({len(issues)}):")
+        lines.extend(f"   • {i}" for i in issues)
+    else:
+        lines.append("\n✓ Configuration valid!")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
     
-    print("\n✓ Configuration valid!")
+    if issues:
+        return False, issues
     return True, []
 
 
-def generate_env_template():
-    """Generate .env template with all options"""
-    template = '''# Secure Edge Vision System Configuration
+# Default .env contents (see generate_env_template)
+_ENV_TEMPLATE = '''# Secure Edge Vision System Configuration
 # Copy this file to .env and modify as needed
 
 # ============ Camera Settings ============
@@ -491,7 +642,12 @@ EVIDENCE_RECORDINGS_PATH=recordings/evidence
 # WARNING: Backup this file! Without it, evidence cannot be decrypted
 ENCRYPTION_KEY_PATH=keys/master.key
 '''
-    return template
+_ENV_TEMPLATE_BYTES = _ENV_TEMPLATE.encode("utf-8")
+
+
+def generate_env_template():
+    """Generate .env template with all options"""
+    return _ENV_TEMPLATE
 
 
 def create_default_env():
@@ -502,62 +658,65 @@ def create_default_env():
         print(".env already exists, skipping")
         return False
     
-    env_path.write_text(generate_env_template())
+    env_path.write_bytes(_ENV_TEMPLATE_BYTES)
     print("Created .env with default settings")
     return True
 
 
 def show_system_info():
     """Display system information"""
-    print("\n" + "=" * 50)
-    print("  SYSTEM INFORMATION")
-    print("=" * 50)
+    lines = [
+        "\n" + "=" * 50,
+        "  SYSTEM INFORMATION",
+        "=" * 50,
+    ]
     
     # Python
-    print(f"\nPython: {sys.version}")
+    vi = sys.version_info
+    lines.append(f"\nPython: {vi.major}.{vi.minor}.{vi.micro}")
+    
+    # Import OpenCV and PyTorch side by side so their shared-library loads overlap
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        cv2_future = pool.submit(importlib.import_module, "cv2")
+        torch_future = pool.submit(importlib.import_module, "torch")
     
     # OpenCV
     try:
-        import cv2
-        print(f"OpenCV: {cv2.__version__}")
+        cv2 = cv2_future.result()
+        lines.append(f"OpenCV: {cv2.__version__}")
     except ImportError:
-        print("OpenCV: NOT INSTALLED")
+        lines.append("OpenCV: NOT INSTALLED")
     
     # PyTorch
     try:
-        import torch
-        print(f"PyTorch: {torch.__version__}")
-        print(f"CUDA Available: {torch.cuda.is_available()}")
-        if torch.cuda.is_available():
-            print(f"GPU: {torch.cuda.get_device_name(0)}")
-            print(f"CUDA Version: {torch.version.cuda}")
-    except ImportError:
-        print("PyTorch: NOT INSTALLED")
-    
-    # Ultralytics
-    try:
-        import ultralytics
-        print(f"Ultralytics: {ultralytics.__version__}")
-    except ImportError:
-        print("Ultralytics: NOT INSTALLED")
-    
-    # FastAPI
-    try:
-        import fastapi
-        print(f"FastAPI: {fastapi.__version__}")
+        torch = torch_future.result()
+        lines.append(f"PyTorch: {torch.__version__}")
+        # CUDA_VISIBLE_DEVICES="" hides all GPUs; skip the driver init
+        cuda_available = os.environ.get("CUDA_VISIBLE_DEVICES") != "" and torch.cuda.is_available()
+        lines.append(f"CUDA Available: {cuda_available}")
+        if cuda_available:
+            lines.append(f"GPU: {torch.cuda.get_device_name(0)}")
+            lines.append(f"CUDA Version: {torch.version.cuda}")
     except ImportError:
-        print("FastAPI: NOT INSTALLED")
+        lines.append("PyTorch: NOT INSTALLED")
+    
+    # Ultralytics, FastAPI, Cryptography - versions come from package
+    # metadata so none of them (nor torch/pydantic/OpenSSL bindings) is imported
+    from importlib.metadata import version, PackageNotFoundError
+    for label, dist in (("Ultralytics", "ultralytics"),
+                        ("FastAPI", "fastapi"),
+                        ("Cryptography", "cryptography")):
+        try:
+            lines.append(f"{label}: {version(dist)}")
+        except PackageNotFoundError:
+            lines.append(f"{label}: NOT INSTALLED")
     
-    # Cryptography
-    try:
-        import cryptography
-        print(f"Cryptography: {cryptography.__version__}")
-    except ImportError:
-        print("Cryptography: NOT INSTALLED")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
-def main():
-    """Main entry point"""
+def _build_parser():
+    """Build the config.py command-line parser"""
     import argparse
     
     parser = argparse.ArgumentParser(description="Configuration Utility")
@@ -565,8 +724,24 @@ def main():
     parser.add_argument("--info", "-i", action="store_true", help="Show system information")
     parser.add_argument("--create-env", action="store_true", help="Create default .env file")
     parser.add_argument("--template", "-t", action="store_true", help="Print .env template")
+    parser.add_argument("--probe-camera", action="store_true", help="Open the camera during validation")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point"""
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    # Fast paths: a lone --template / --create-env needs no parser
+    if argv in (["--template"], ["-t"]):
+        print(generate_env_template())
+        return 0
+    if argv == ["--create-env"]:
+        create_default_env()
+        return 0
     
-    args = parser.parse_args()
+    args = _build_parser().parse_args(argv)
     
     if args.template:
         print(generate_env_template())
@@ -581,12 +756,12 @@ def main():
         return 0
     
     if args.validate:
-        valid, _ = validate_config()
+        valid, _ = validate_config(probe_camera=args.probe_camera)
         return 0 if valid else 1
     
     # Default: show all info
     show_system_info()
-    validate_config()
+    validate_config(get_config(), probe_camera=args.probe_camera)
     
     return 0
 
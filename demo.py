@@ -7,6 +7,9 @@ import os
 import sys
 import time
 import logging
+import functools
+import queue
+import threading
 from pathlib import Path
 
 # Disable logging noise
@@ -23,6 +26,8 @@ sys.path.insert(0, str(project_root))
 from dotenv import load_dotenv
 load_dotenv()
 
+from config import parse_camera_source
+
 
 # Colors for terminal
 class Colors:
@@ -34,9 +39,47 @@ class Colors:
     END = '\033[0m'
 
 
-def print_banner():
-    """Print beautiful banner"""
-    banner = f"""
+# Rendered overlay text: (text, scale, thickness) -> (coverage mask, y offset, x offset)
+_TEXT_CACHE = {}
+_TEXT_CACHE_MAX = 512
+
+
+def _put_text(img: np.ndarray, text: str, org, scale: float, color, thickness: int = 2):
+    """
+    cv2.putText (Hershey simplex) through a cache of rendered glyph coverage
+    
+    Each distinct string is rasterized once; later frames only blend the
+    cached coverage mask, giving the same pixels as a direct putText call.
+    """
+    key = (text, scale, thickness)
+    cached = _TEXT_CACHE.get(key)
+    if cached is None:
+        if len(_TEXT_CACHE) >= _TEXT_CACHE_MAX:
+            _TEXT_CACHE.clear()
+        (tw, th), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+        pad = thickness + 1
+        canvas = np.zeros((th + baseline + 2 * pad, tw + 2 * pad), np.uint8)
+        cv2.putText(canvas, text, (pad, th + pad), cv2.FONT_HERSHEY_SIMPLEX, scale, 255, thickness)
+        alpha = canvas[..., None].astype(np.uint16)
+        cached = _TEXT_CACHE[key] = (alpha, th + pad, pad)
+    
+    mask, dy, dx = cached
+    x0, y0 = org[0] - dx, org[1] - dy
+    h, w = img.shape[:2]
+    # Clip the mask to the image
+    mx0, my0 = max(0, -x0), max(0, -y0)
+    mx1 = min(mask.shape[1], w - x0)
+    my1 = min(mask.shape[0], h - y0)
+    if mx1 <= mx0 or my1 <= my0:
+        return
+    # Blend color over the patch with the glyph coverage as alpha
+    roi = img[y0 + my0:y0 + my1, x0 + mx0:x0 + mx1]
+    alpha = mask[my0:my1, mx0:mx1]
+    roi[:] = (roi * (255 - alpha) + np.array(color, np.uint16) * alpha + 127) // 255
+
+
+# Console chrome, built once at import
+_BANNER = f"""
 {Colors.CYAN}{Colors.BOLD}
 ╔══════════════════════════════════════════════════════════════╗
 ║                                                              ║
@@ -58,14 +101,25 @@ def print_banner():
 ║                                                              ║
 ╚══════════════════════════════════════════════════════════════╝
 {Colors.END}"""
-    print(banner)
+_BAR = '─' * 58
+_SECTION_TOP = f"\n{Colors.CYAN}┌{_BAR}┐{Colors.END}"
+_SECTION_BOT = f"{Colors.CYAN}└{_BAR}┘{Colors.END}"
+
+
+def print_banner():
+    """Print beautiful banner"""
+    sys.stdout.write(_BANNER + "\n")
+    sys.stdout.flush()
 
 
 def print_section(title: str):
     """Print section header"""
-    print(f"\n{Colors.CYAN}┌{'─' * 58}┐{Colors.END}")
-    print(f"{Colors.CYAN}│{Colors.END} {Colors.BOLD}{title:<56}{Colors.END} {Colors.CYAN}│{Colors.END}")
-    print(f"{Colors.CYAN}└{'─' * 58}┘{Colors.END}")
+    sys.stdout.write(
+        f"{_SECTION_TOP}\n"
+        f"{Colors.CYAN}│{Colors.END} {Colors.BOLD}{title:<56}{Colors.END} {Colors.CYAN}│{Colors.END}\n"
+        f"{_SECTION_BOT}\n"
+    )
+    sys.stdout.flush()
 
 
 def print_success(text: str):
@@ -88,14 +142,79 @@ def print_info(text: str):
     print(f"  {Colors.CYAN}→{Colors.END} {text}")
 
 
-def test_camera() -> bool:
-    """Test camera capture"""
+@functools.lru_cache(maxsize=None)
+def _camera_source():
+    """CAMERA_SOURCES as a camera index or URL (read once; --camera is applied first)"""
+    return parse_camera_source(os.getenv("CAMERA_SOURCES", "0"))
+
+
+def _open_camera(source):
+    """Open a capture that always returns the freshest frame"""
+    cap = cv2.VideoCapture(source)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    if isinstance(source, int):
+        # MJPG skips the driver-side YUYV->BGR conversion on most webcams
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    return cap
+
+
+def ensure_trt_engine(model_path: str) -> str:
+    """
+    Export model to a TensorRT FP16 engine once and return its path
+    
+    The engine is cached next to the weights (models/model.pt ->
+    models/model.engine). Falls back to model_path without CUDA.
+    """
+    engine_path = Path(model_path).with_suffix(".engine")
+    if engine_path.exists():
+        return str(engine_path)
+    
+    try:
+        import torch
+        if not torch.cuda.is_available():
+            print_warning("TensorRT needs CUDA - using PyTorch model")
+            return model_path
+        
+        from ultralytics import YOLO
+        print_info(f"Exporting TensorRT engine (one-time): {engine_path}")
+        exported = YOLO(model_path).export(format="engine", half=True, imgsz=640, device=0)
+        return str(exported)
+    except Exception as e:
+        print_warning(f"TensorRT export failed ({e}) - using PyTorch model")
+        return model_path
+
+
+@functools.lru_cache(maxsize=2)
+def _get_yolo(model_path: str):
+    """
+    Load a YOLO model once per path and warm it up
+    
+    Shared by the detection and live blur tests so the second one skips
+    the load and the first-inference spike. The warmup fixes device and
+    precision for every later predict (FP16 on CUDA).
+    """
+    from ultralytics import YOLO
+    import torch
+    
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    model = YOLO(model_path, task="detect")
+    model.predict(np.zeros((640, 640, 3), np.uint8), device=device,
+                  half=(device == "cuda"), verbose=False)
+    return model
+
+
+def test_camera(probe: dict = None) -> bool:
+    """
+    Test camera capture
+    
+    If a probe dict is given, the open capture and first frame are left in
+    it ("cap", "frame") for the later tests instead of reopening the camera.
+    """
     print_section("Camera")
     
-    source = os.getenv("CAMERA_SOURCES", "0")
-    source = int(source) if source.isdigit() else source
+    source = _camera_source()
     
-    cap = cv2.VideoCapture(source)
+    cap = _open_camera(source)
     
     if not cap.isOpened():
         print_error(f"Cannot open camera: {source}")
@@ -105,7 +224,10 @@ def test_camera() -> bool:
     width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     fps = int(cap.get(cv2.CAP_PROP_FPS))
-    cap.release()
+    if probe is not None and ret:
+        probe["cap"], probe["frame"] = cap, frame
+    else:
+        cap.release()
     
     if ret:
         print_success(f"Camera opened: {source}")
@@ -142,39 +264,45 @@ def test_gpu() -> bool:
         return True
 
 
-def test_detection() -> bool:
+def test_detection(trt: bool = False, probe: dict = None) -> bool:
     """Test YOLO detection"""
     print_section("AI Model (YOLOv8)")
     
     try:
-        from ultralytics import YOLO
         import torch
         
         # Check for face model
         if os.path.exists("models/model.pt"):
-            model_path = "models/model.pt"
+            model_path = os.path.abspath("models/model.pt")
             model_type = "Face Detection"
         else:
             model_path = "yolov8n.pt"
             model_type = "Object Detection"
         
-        model = YOLO(model_path)
+        if trt:
+            model_path = ensure_trt_engine(model_path)
+        
+        model = _get_yolo(model_path)
         print_success(f"Model loaded: {model_type}")
         print_info(f"Path: {model_path}")
         
-        # Test detection
-        source = os.getenv("CAMERA_SOURCES", "0")
-        source = int(source) if source.isdigit() else source
-        
-        cap = cv2.VideoCapture(source)
-        ret, frame = cap.read()
-        cap.release()
+        # Test detection (on the frame test_camera already captured, if any)
+        frame = probe.get("frame") if probe else None
+        ret = frame is not None
+        if not ret:
+            cap = _open_camera(_camera_source())
+            ret, frame = cap.read()
+            cap.release()
         
         if ret:
             device = "cuda" if torch.cuda.is_available() else "cpu"
-            start = time.time()
-            results = model.predict(frame, device=device, verbose=False)
-            elapsed = (time.time() - start) * 1000
+            from modules.processor import INFER_SIZE, resize_for_inference
+            
+            start = time.perf_counter_ns()
+            small, _ = resize_for_inference(frame)
+            results = model.predict(small, device=device, half=(device == "cuda"),
+                                    imgsz=INFER_SIZE, verbose=False)
+            elapsed = (time.perf_counter_ns() - start) * 1e-6
             
             detections = len(results[0].boxes) if results else 0
             print_success(f"Detection test passed")
@@ -193,6 +321,12 @@ def test_security() -> bool:
     
     try:
         from modules.security import SecureVault, EncryptedPackage
+        from cryptography.exceptions import InvalidTag
+        import cryptography
+        
+        # AESGCM runs on the EVP layer of cryptography's bundled OpenSSL (AES-NI/PCLMULQDQ
+        # when the CPU has them; set OPENSSL_ia32cap to mask them off for comparison)
+        print_info(f"Backend: cryptography {cryptography.__version__}")
         
         vault = SecureVault()
         test_data = b"Secret video frame data for forensic evidence"
@@ -207,10 +341,12 @@ def test_security() -> bool:
         if decrypted == test_data:
             print_success("Decryption verified")
         
-        # Tamper test
+        # Tamper test (flip the last bit in a mutable copy)
+        flipped = bytearray(package.ciphertext)
+        flipped[-1] ^= 1
         tampered = EncryptedPackage(
             nonce=package.nonce,
-            ciphertext=package.ciphertext[:-1] + bytes([package.ciphertext[-1] ^ 1]),
+            ciphertext=bytes(flipped),
             original_hash=package.original_hash,
             timestamp=package.timestamp,
             metadata=package.metadata
@@ -220,7 +356,7 @@ def test_security() -> bool:
             vault.unlock_evidence(tampered)
             print_error("Tamper detection FAILED!")
             return False
-        except ValueError:
+        except (ValueError, InvalidTag):
             print_success("Tamper detection working")
         
         return True
@@ -230,8 +366,15 @@ def test_security() -> bool:
         return False
 
 
-def test_blur_live() -> bool:
-    """Test face blurring with live video"""
+def test_blur_live(trt: bool = False, batch_size: int = 1, target_fps: float = 30.0,
+                   fused_blur: bool = False, probe: dict = None) -> bool:
+    """
+    Test face blurring with live video (batch_size frames per detector call)
+    
+    When detection takes longer than one frame at target_fps, the following
+    frames skip inference and reuse the last detected boxes. fused_blur
+    blurs the frame once and composites all faces through one mask.
+    """
     print_section("Live Face Blur")
     
     try:
@@ -239,9 +382,20 @@ def test_blur_live() -> bool:
         import torch
         
         device = "cuda" if torch.cuda.is_available() else "cpu"
-        processor = FrameProcessor(device=device)
+        if device == "cuda":
+            # Allow TF32 for any FP32 matmuls left outside the FP16 path
+            torch.set_float32_matmul_precision("high")
+        
+        # FP16 inference on CUDA (Tensor Cores); ignored on CPU
+        processor = FrameProcessor(device=device, half=(device == "cuda"), fused_blur=fused_blur)
+        if trt:
+            processor.model_path = ensure_trt_engine(processor.model_path)
+            if batch_size > 1 and processor.model_path.endswith(".engine"):
+                print_warning("TensorRT engine is exported for batch 1 - using --batch 1")
+                batch_size = 1
         
-        if not processor.load_model():
+        # Reuse the model test_detection already loaded and warmed up
+        if not processor.load_model(_get_yolo(processor.model_path)):
             print_error("Failed to load model")
             return False
         
@@ -250,11 +404,12 @@ def test_blur_live() -> bool:
         print_info(f"Device: {device.upper()}")
         
         # Open camera
-        source = os.getenv("CAMERA_SOURCES", "0")
-        source = int(source) if source.isdigit() else source
-        
-        cap = cv2.VideoCapture(source)
+        # Take over the capture test_camera left open, if any
+        cap = probe.pop("cap", None) if probe else None
+        if cap is None:
+            cap = _open_camera(_camera_source())
         if not cap.isOpened():
+            cap.release()
             print_error("Cannot open camera")
             return False
         
@@ -263,58 +418,112 @@ def test_blur_live() -> bool:
         print(f"  {Colors.YELLOW}Press Q to stop{Colors.END}")
         
         frame_count = 0
-        fps_start = time.time()
+        fps_start = time.perf_counter_ns()
         current_fps = 0
         
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            # Process
-            start = time.time()
-            blurred, raw, detections = processor.process(frame)
-            proc_time = (time.time() - start) * 1000
-            
-            # FPS
-            frame_count += 1
-            elapsed = time.time() - fps_start
-            if elapsed >= 1.0:
-                current_fps = frame_count / elapsed
-                frame_count = 0
-                fps_start = time.time()
-            
-            # Draw overlay
-            h, w = blurred.shape[:2]
-            
-            # Semi-transparent header
-            overlay = blurred.copy()
-            cv2.rectangle(overlay, (0, 0), (w, 100), (0, 0, 0), -1)
-            blurred = cv2.addWeighted(overlay, 0.5, blurred, 0.5, 0)
-            
-            # Stats
-            cv2.putText(blurred, f"FPS: {current_fps:.1f}", (20, 35),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-            cv2.putText(blurred, f"Faces: {len(detections)}", (20, 65),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-            cv2.putText(blurred, f"Latency: {proc_time:.0f}ms", (20, 95),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-            
-            # Device badge
-            cv2.putText(blurred, device.upper(), (w - 80, 35),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 200, 255), 2)
-            
-            # Privacy notice
-            cv2.putText(blurred, "PRIVACY PROTECTED", (w//2 - 100, h - 20),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 200, 255), 2)
-            
-            cv2.imshow("Secure Edge Vision - Live Preview (Q to quit)", blurred)
-            
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
+        # Capture on a background thread so camera reads overlap inference;
+        # the size-1 queue always holds the newest frame (None = stream ended)
+        frames = queue.Queue(maxsize=1)
+        running = threading.Event()
+        running.set()
         
-        cap.release()
-        cv2.destroyAllWindows()
+        def grab():
+            # Owns cap: released here after the last read, never under a
+            # read that is still blocked
+            try:
+                while running.is_set():
+                    ret, frame = cap.read()
+                    if not ret:
+                        frame = None
+                    try:
+                        frames.get_nowait()  # Drop the stale frame
+                    except queue.Empty:
+                        pass
+                    frames.put(frame)
+                    if frame is None:
+                        break
+            finally:
+                cap.release()
+        
+        grabber = threading.Thread(target=grab, daemon=True)
+        grabber.start()
+        
+        try:
+            batch = []    # Captured frames waiting for the detector
+            pending = []  # Processed (blurred, raw, detections) waiting to be shown
+            out = None    # Reused output buffers, one per batch slot
+            budget_ms = 1000.0 / target_fps
+            skip = 0           # Frames left to show without inference
+            last_faces = []    # Boxes from the most recent detector call
+            
+            while True:
+                if not pending:
+                    frame = frames.get()
+                    if frame is None:
+                        break
+                    
+                    if skip and not batch:
+                        # Over budget: blur with the previous boxes instead of detecting
+                        skip -= 1
+                        pending = [(processor.apply_blur(frame, last_faces, out[0]), frame, last_faces)]
+                        continue
+                    
+                    batch.append(frame)
+                    if len(batch) < batch_size:
+                        continue
+                    
+                    if out is None:
+                        out = [np.empty_like(frame) for _ in range(batch_size)]
+                    
+                    # Process (one detector call per batch; latency is per frame)
+                    start = time.perf_counter_ns()
+                    if batch_size > 1:
+                        pending = processor.process_batch(batch, out=out)
+                    else:
+                        pending = [processor.process(frame, out=out[0])]
+                    proc_time = (time.perf_counter_ns() - start) * 1e-6 / len(batch)
+                    batch = []
+                    last_faces = pending[-1][2]
+                    skip = max(0, int(proc_time / budget_ms) - 1)
+                
+                blurred, raw, detections = pending.pop(0)
+                
+                # FPS
+                frame_count += 1
+                elapsed = (time.perf_counter_ns() - fps_start) * 1e-9
+                if elapsed >= 1.0:
+                    current_fps = frame_count / elapsed
+                    frame_count = 0
+                    fps_start = time.perf_counter_ns()
+                
+                # Draw overlay
+                h, w = blurred.shape[:2]
+                
+                # Semi-transparent header (darken rows 0-100 in place, as the
+                # inclusive rectangle to y=100 did)
+                header = blurred[:101]
+                cv2.convertScaleAbs(header, dst=header, alpha=0.5)
+                
+                # Stats (text rendering cached per distinct string)
+                _put_text(blurred, f"FPS: {current_fps:.1f}", (20, 35), 0.8, (0, 255, 0))
+                _put_text(blurred, f"Faces: {len(detections)}", (20, 65), 0.8, (0, 255, 0))
+                _put_text(blurred, f"Latency: {proc_time:.0f}ms", (20, 95), 0.8, (0, 255, 0))
+                
+                # Device badge
+                _put_text(blurred, device.upper(), (w - 80, 35), 0.7, (0, 200, 255))
+                
+                # Privacy notice
+                _put_text(blurred, "PRIVACY PROTECTED", (w//2 - 100, h - 20), 0.6, (0, 200, 255))
+                
+                cv2.imshow("Secure Edge Vision - Live Preview (Q to quit)", blurred)
+                
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+        finally:
+            # Also on errors: stop the grabber (it releases the camera)
+            running.clear()
+            grabber.join(timeout=1.0)
+            cv2.destroyAllWindows()
         
         print()
         print_success("Live blur test completed")
@@ -327,43 +536,53 @@ def test_blur_live() -> bool:
         return False
 
 
+_SUMMARY_HEADER = (
+    f"\n{Colors.CYAN}{'═' * 60}{Colors.END}\n"
+    f"{Colors.BOLD}  TEST SUMMARY{Colors.END}\n"
+    f"{Colors.CYAN}{'═' * 60}{Colors.END}\n\n"
+)
+_PASS_MARK = f"  {Colors.GREEN}✓{Colors.END} "
+_FAIL_MARK = f"  {Colors.RED}✗{Colors.END} "
+_ALL_PASSED = (
+    f"  {Colors.GREEN}{Colors.BOLD}🎉 All tests passed!{Colors.END}\n"
+    f"\n  {Colors.CYAN}Next steps:{Colors.END}\n"
+    f"    python main.py\n"
+    f"    Open: http://localhost:8000\n"
+)
+_SOME_FAILED = f"  {Colors.YELLOW}⚠ Some tests failed{Colors.END}\n"
+
+
 def print_summary(results: dict):
     """Print test summary"""
-    print(f"\n{Colors.CYAN}{'═' * 60}{Colors.END}")
-    print(f"{Colors.BOLD}  TEST SUMMARY{Colors.END}")
-    print(f"{Colors.CYAN}{'═' * 60}{Colors.END}\n")
-    
-    all_passed = True
-    for name, passed in results.items():
-        if passed:
-            print(f"  {Colors.GREEN}✓{Colors.END} {name}")
-        else:
-            print(f"  {Colors.RED}✗{Colors.END} {name}")
-            all_passed = False
-    
-    print()
-    if all_passed:
-        print(f"  {Colors.GREEN}{Colors.BOLD}🎉 All tests passed!{Colors.END}")
-        print(f"\n  {Colors.CYAN}Next steps:{Colors.END}")
-        print(f"    python main.py")
-        print(f"    Open: http://localhost:8000")
-    else:
-        print(f"  {Colors.YELLOW}⚠ Some tests failed{Colors.END}")
+    parts = [_SUMMARY_HEADER]
+    parts.extend(f"{_PASS_MARK if passed else _FAIL_MARK}{name}\n" for name, passed in results.items())
+    parts.append("\n")
+    parts.append(_ALL_PASSED if all(results.values()) else _SOME_FAILED)
+    parts.append("\n")
     
-    print()
+    # One write for the whole summary
+    sys.stdout.write("".join(parts))
+    sys.stdout.flush()
 
 
-def run_all_tests():
+def run_all_tests(trt: bool = False, batch_size: int = 1, target_fps: float = 30.0,
+                  fused_blur: bool = False):
     """Run all component tests"""
     print_banner()
     
-    results = {
-        "Camera": test_camera(),
-        "GPU": test_gpu(),
-        "AI Model": test_detection(),
-        "Security": test_security(),
-        "Live Blur": test_blur_live()
-    }
+    # Camera opened once by test_camera and shared with the later tests
+    probe = {"cap": None, "frame": None}
+    try:
+        results = {
+            "Camera": test_camera(probe),
+            "GPU": test_gpu(),
+            "AI Model": test_detection(trt, probe),
+            "Security": test_security(),
+            "Live Blur": test_blur_live(trt, batch_size, target_fps, fused_blur, probe)
+        }
+    finally:
+        if probe.get("cap") is not None:
+            probe["cap"].release()
     
     print_summary(results)
 
@@ -376,6 +595,12 @@ def main():
     parser.add_argument("--cameras", "-c", action="store_true", help="List cameras")
     parser.add_argument("--quick", "-q", action="store_true", help="Quick test")
     parser.add_argument("--camera", type=str, help="Camera index/URL")
+    parser.add_argument("--trt", action="store_true", help="Use a TensorRT FP16 engine (exported once)")
+    parser.add_argument("--batch", type=int, default=1, help="Frames per detector call in the live preview")
+    parser.add_argument("--target-fps", type=float, default=30.0,
+                        help="Live preview frame budget; slower detections skip inference on following frames")
+    parser.add_argument("--fused-blur", action="store_true",
+                        help="Blur the frame once and mask in all faces instead of blurring each face")
     
     args = parser.parse_args()
     
@@ -392,16 +617,21 @@ def main():
     
     if args.quick:
         print_banner()
-        results = {
-            "Camera": test_camera(),
-            "GPU": test_gpu(),
-            "AI Model": test_detection(),
-            "Security": test_security()
-        }
+        probe = {"cap": None, "frame": None}
+        try:
+            results = {
+                "Camera": test_camera(probe),
+                "GPU": test_gpu(),
+                "AI Model": test_detection(args.trt, probe),
+                "Security": test_security()
+            }
+        finally:
+            if probe.get("cap") is not None:
+                probe["cap"].release()
         print_summary(results)
         return
     
-    run_all_tests()
+    run_all_tests(args.trt, max(1, args.batch), max(1.0, args.target_fps), args.fused_blur)
 
 
 if __name__ == "__main__":
@@ -2,10 +2,11 @@
 Download YOLOv11-Face model from YapaLab for Preset 2
 Source: https://github.com/YapaLab/yolo-face
 """
-import urllib.request
 import os
 from pathlib import Path
 
+from modules.download import parallel_download
+
 print("=" * 70)
 print("  Downloading YOLOv11-Face Model from YapaLab")
 print("=" * 70)
@@ -34,7 +35,7 @@ try:
             total_mb = total_size / (1024 * 1024)
             print(f'\r  Progress: [{bar}] {percent:.1f}% ({size_mb:.1f}/{total_mb:.1f} MB)', end='', flush=True)
     
-    urllib.request.urlretrieve(url, target_path, reporthook=show_progress)
+    parallel_download(url, target_path, reporthook=show_progress)
     print()
     print()
     print(f"✅ Model downloaded successfully!")
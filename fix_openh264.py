@@ -16,11 +16,13 @@ Author: SECURE EDGE VISION SYSTEM
 
 import os
 import sys
-import urllib.request
+import shutil
 import zipfile
 import platform
 from pathlib import Path
 
+from modules.download import parallel_download
+
 def get_opencv_path():
     """Get the OpenCV installation path."""
     try:
@@ -61,7 +63,7 @@ def download_openh264():
         print(f"⬇️  Downloading {zip_name}...")
         zip_path = temp_dir / zip_name
         
-        urllib.request.urlretrieve(url, zip_path, reporthook=download_progress)
+        parallel_download(url, zip_path, reporthook=download_progress)
         print()
         print("✅ Download complete!")
         
@@ -72,7 +74,8 @@ def download_openh264():
         dll_path = temp_dir / dll_name.replace(f"-{version}", "")
         with bz2.open(zip_path, 'rb') as f_in:
             with open(dll_path, 'wb') as f_out:
-                f_out.write(f_in.read())
+                # Stream in 1 MB blocks instead of holding the whole DLL in memory
+                shutil.copyfileobj(f_in, f_out, length=1 << 20)
         
         print(f"✅ Extracted: {dll_path.name}")
         
@@ -87,10 +90,18 @@ def download_openh264():
         ]
         
         print(f"📁 Installing to OpenCV directory...")
-        import shutil
+        data = None
         for dest_name in dest_names:
             dest_path = cv_path / dest_name
-            shutil.copy2(dll_path, dest_path)
+            dest_path.unlink(missing_ok=True)
+            try:
+                # Hard link: one copy on disk, survives the temp cleanup
+                os.link(dll_path, dest_path)
+            except OSError:
+                # Different volume or no link support - write the bytes (read once)
+                if data is None:
+                    data = dll_path.read_bytes()
+                dest_path.write_bytes(data)
             print(f"   ✓ {dest_name}")
         
         dest_path = cv_path / dest_names[0]  # Use first one for reference
@@ -98,8 +109,6 @@ def download_openh264():
         
         print(f"📁 Main installation: {dest_path}")
         
-        import shutil
-        
         print("✅ Installation complete!")
         print()
         
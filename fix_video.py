@@ -1,6 +1,7 @@
 import os
 import urllib.request
 import bz2
+import shutil
 import sys
 from pathlib import Path
 
@@ -46,12 +47,12 @@ def setup_h264():
         print("Extracting...")
         with bz2.BZ2File(bz2_file) as f:
             with open(dll_name, 'wb') as dest:
-                dest.write(f.read())
+                # Stream in 1 MB blocks instead of holding the whole DLL in memory
+                shutil.copyfileobj(f, dest, length=1 << 20)
         
         os.remove(bz2_file)
         
         # Also create a copy without the version number, some FFMPEG builds look for this
-        import shutil
         shutil.copy(dll_name, "openh264.dll")
         
         print(f"✓ Installed {dll_name} and openh264.dll")
@@ -10,12 +10,12 @@ import asyncio
 import threading
 import time
 import re
+import itertools
 from pathlib import Path
 from datetime import datetime
 from contextlib import asynccontextmanager
 
-import cv2
-import numpy as np
+import aiofiles
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import HTMLResponse, StreamingResponse, FileResponse
 from fastapi.templating import Jinja2Templates
@@ -26,15 +26,23 @@ from dotenv import load_dotenv
 # Silencing OpenCV/FFMPEG persistent warnings
 os.environ["OPENCV_LOG_LEVEL"] = "OFF"
 os.environ["OPENCV_FFMPEG_LOGLEVEL"] = "-8" # Deep silence for FFMPEG
-import pickle
 import tempfile
 import uuid
 import hashlib
 import psutil
 from typing import Optional, Dict
 
-from config import Config
+try:
+    import orjson  # Faster metadata parsing for analytics
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
+
+from config import get_config
 from modules.engine import get_system, processing_loop
+from modules import decrypt
+from modules.storage import scan_files
 
 # Load environment
 load_dotenv()
@@ -69,6 +77,8 @@ async def lifespan(app: FastAPI):
     
     try:
         system.start()
+        system.attach_loop(loop)
+        decrypt.start()
         
         # Start processing thread for each configured camera
         for i in range(len(system.config.camera_sources)):
@@ -79,6 +89,7 @@ async def lifespan(app: FastAPI):
         
     finally:
         system.stop()
+        decrypt.shutdown()
 
 
 from fastapi.staticfiles import StaticFiles
@@ -124,17 +135,34 @@ async def gallery_page(request: Request):
 async def generate_frames(camera_idx: int):
     """Generate MJPEG frames for a specific camera"""
     system = get_system()
-    
-    while system.running:  # Exit immediately when system stops
-        frame, detections, fps = system.get_frame(camera_idx)
-        
-        if frame is not None:
-            # Encode frame to JPEG
-            _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            yield (b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + 
-                   buffer.tobytes() + b'\r\n')
-        
-        await asyncio.sleep(0.04)  # ~25 FPS for streaming bandwidth
+    cond = system.frame_conditions.get(camera_idx)
+    last_id = -1
+    
+    # Counted as a viewer so the processing thread notifies this camera
+    with system.viewing(camera_idx):
+        while system.running:  # Exit immediately when system stops
+            # JPEG shared with the other viewers of this camera
+            jpeg, frame_id = system.get_jpeg(camera_idx)
+            
+            if jpeg is not None and frame_id != last_id:
+                yield (b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + 
+                       jpeg + b'\r\n')
+            last_id = frame_id
+            
+            if cond is None:
+                await asyncio.sleep(0.04)  # No frame notifications - poll
+                continue
+            
+            # Sleep until the processing thread publishes a newer frame
+            try:
+                async with cond:
+                    await asyncio.wait_for(
+                        cond.wait_for(lambda: system.frame_ids.get(camera_idx, 0) != last_id
+                                      or not system.running),
+                        timeout=1.0
+                    )
+            except asyncio.TimeoutError:
+                pass
 
 
 @app.get("/")
@@ -201,9 +229,58 @@ async def analytics_page(request: Request):
 @app.get("/api/analytics")
 async def get_analytics_data():
     """Aggregate data for charts: detections, storage, and system health"""
-    system = get_system()
-    import json
+    # File scans and JSON parsing run in a worker thread, off the event loop
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, _cached_analytics, get_system())
+
+
+# Last analytics payload; reused while recordings metadata is unchanged
+_analytics_cache = {"ts": 0.0, "fingerprint": None, "payload": None, "cleanup_ts": 0.0}
+_analytics_lock = threading.Lock()
+ANALYTICS_TTL = 5.0        # seconds a payload is served without recomputing
+CLEANUP_INTERVAL = 60.0    # seconds between retention checks if nothing changed
+
+
+# Camera name in metadata file names (public_cam0_..., public_rtsp_...)
+_CAM_RE = re.compile(r'public_(cam\d+|rtsp)_')
+
+
+def _metadata_fingerprint(public_path: str) -> tuple:
+    """(newest mtime, count) of the metadata files - changes when recordings do"""
+    newest, count = 0.0, 0
+    try:
+        with os.scandir(public_path) as it:
+            for entry in it:
+                if entry.name.endswith(".json") and entry.is_file():
+                    count += 1
+                    newest = max(newest, entry.stat().st_mtime)
+    except OSError:
+        pass
+    return newest, count
+
+
+def _cached_analytics(system) -> dict:
+    """Analytics payload, recomputed only after the TTL or when metadata changes"""
+    fingerprint = _metadata_fingerprint(os.getenv("PUBLIC_RECORDINGS_PATH", "recordings/public"))
     
+    with _analytics_lock:
+        cache = _analytics_cache
+        now_ts = time.time()
+        changed = fingerprint != cache["fingerprint"]
+        if not changed and cache["payload"] is not None and now_ts - cache["ts"] < ANALYTICS_TTL:
+            return cache["payload"]
+        
+        run_cleanup = changed or now_ts - cache["cleanup_ts"] >= CLEANUP_INTERVAL
+        payload = _compute_analytics(system, run_cleanup)
+        
+        cache.update(ts=now_ts, fingerprint=fingerprint, payload=payload)
+        if run_cleanup:
+            cache["cleanup_ts"] = now_ts
+        return payload
+
+
+def _compute_analytics(system, run_cleanup: bool = True) -> dict:
+    """Blocking body of /api/analytics"""
     # 1. Storage Stats
     public_path = Path(os.getenv("PUBLIC_RECORDINGS_PATH", "recordings/public"))
     evidence_path = Path(os.getenv("EVIDENCE_RECORDINGS_PATH", "recordings/evidence"))
@@ -214,18 +291,39 @@ async def get_analytics_data():
         "by_camera": {}
     }
     
-    if public_path.exists():
-        for f in list(public_path.glob("*.mp4")) + list(public_path.glob("*.avi")):
-            size = f.stat().st_size / (1024 * 1024)
-            storage_data["public"] += size
-            parts = f.name.split('_')
+    # One os.scandir pass per root gathers sizes, counts, recent usage and
+    # the metadata list (one stat per file)
+    now_ts = time.time()
+    recent_mb = 0       # Written in the last hour
+    public_files = 0
+    evidence_files = 0
+    meta_entries = []   # (mtime, path) of top-level *.json metadata
+    public_root = str(public_path)
+    
+    for mtime, path, size in scan_files(public_root):
+        size_mb = size / (1024 * 1024)
+        if now_ts - mtime < 3600:
+            recent_mb += size_mb
+        if os.path.dirname(path) != public_root:
+            continue
+        name = os.path.basename(path)
+        if name.endswith((".mp4", ".avi")):
+            public_files += 1
+            storage_data["public"] += size_mb
+            parts = name.split('_')
             if len(parts) > 1:
                 cam = parts[1]
-                storage_data["by_camera"][cam] = storage_data["by_camera"].get(cam, 0) + size
-
-    if evidence_path.exists():
-        for f in evidence_path.rglob("*.enc"):
-            storage_data["evidence"] += f.stat().st_size / (1024 * 1024)
+                storage_data["by_camera"][cam] = storage_data["by_camera"].get(cam, 0) + size_mb
+        elif name.endswith(".json"):
+            meta_entries.append((mtime, Path(path)))
+    
+    for mtime, path, size in scan_files(str(evidence_path)):
+        size_mb = size / (1024 * 1024)
+        if now_ts - mtime < 3600:
+            recent_mb += size_mb
+        if path.endswith(".enc"):
+            evidence_files += 1
+            storage_data["evidence"] += size_mb
 
     # 2. Deep Detection Analysis
     hourly_counts = {i: 0 for i in range(24)}
@@ -234,16 +332,16 @@ async def get_analytics_data():
     recent_logs = []
     total_events = 0
     
-    meta_files = sorted(list(public_path.glob("*.json")), key=lambda x: x.stat().st_mtime, reverse=True)
+    meta_entries.sort(key=lambda e: e[0], reverse=True)
     now = datetime.now()
     
-    for meta_file in meta_files:
+    for meta_mtime, meta_file in meta_entries:
         try:
-            mtime = datetime.fromtimestamp(meta_file.stat().st_mtime)
+            mtime = datetime.fromtimestamp(meta_mtime)
             is_recent = (now - mtime).days == 0
             
-            with open(meta_file, 'r') as f:
-                data = json.load(f)
+            with open(meta_file, 'rb') as f:
+                data = _json_loads(f.read())
                 detections = data.get("detections", [])
                 
                 # Clustering Algorithm: Group frames into logical events
@@ -252,14 +350,17 @@ async def get_analytics_data():
                 last_frame = -999
                 current_event_classes = set()
                 
-                match = re.search(r'public_(cam\d+|rtsp)_', meta_file.name)
+                match = _CAM_RE.search(meta_file.name)
                 cam_name = match.group(1) if match else "unknown"
 
-                for d in detections:
-                    # Compatibility: handle both raw int and new dict format
-                    frame_idx = d if isinstance(d, int) else d.get("f", 0)
-                    classes = ["person"] if isinstance(d, int) else d.get("c", [])
-                    
+                # Compatibility: old files store raw frame ints, new ones
+                # {"f": frame, "c": classes} dicts - detect once per file
+                if detections and isinstance(detections[0], int):
+                    entries = zip(detections, itertools.repeat(("person",)))
+                else:
+                    entries = ((d.get("f", 0), d.get("c", [])) for d in detections)
+
+                for frame_idx, classes in entries:
                     if frame_idx > last_frame + 60:
                         file_event_count += 1
                         # Push previous event summary to logs
@@ -303,21 +404,12 @@ async def get_analytics_data():
     # 3. Storage Forecast & Retention (Thesis-level accuracy)
     from modules.storage import cleanup_storage
     
-    # Force retention check every time analytics is requested
+    # Retention check (rate-limited by _cached_analytics)
     current_total_mb = (storage_data["public"] + storage_data["evidence"])
-    cleanup_storage(str(public_path), str(evidence_path), system.config.max_storage_gb)
+    if run_cleanup:
+        cleanup_storage(str(public_path), str(evidence_path), system.config.max_storage_gb)
     
-    # Calculate more accurate hourly rate (usage in last 60 mins)
-    recent_mb = 0
-    now_ts = time.time()
-    for f in list(public_path.rglob("*.*")) + list(evidence_path.rglob("*.*")):
-        if f.is_file():
-            stat = f.stat()
-            # If created in last 1 hour
-            if now_ts - stat.st_mtime < 3600:
-                recent_mb += stat.st_size / (1024 * 1024)
-    
-    # Hourly rate calculation:
+    # Hourly rate calculation (recent_mb: usage in last 60 mins, from the scan above):
     # Use recent activity if available, else fallback to average
     hourly_rate = recent_mb if recent_mb > 1 else (current_total_mb / 24)
     hourly_rate = max(hourly_rate, 50) # Safety floor 50MB/hr
@@ -357,7 +449,7 @@ async def get_analytics_data():
         days_left = round(remaining_mb / daily_rate_mb, 1) if daily_rate_mb > 0 else 999.9
 
     # 4. Forensic Markers
-    evidence_count = len(list(evidence_path.rglob("*.enc")))
+    evidence_count = evidence_files
     
     # Sort hourly counts nicely for Chart.js
     trend_labels = []
@@ -373,10 +465,6 @@ async def get_analytics_data():
     peak_hour = max(hourly_counts.items(), key=lambda x: x[1])[0] if any(hourly_counts.values()) else 0
     total_detections_today = sum(hourly_counts.values())
     
-    # File statistics
-    public_files = len(list(public_path.glob("*.mp4"))) + len(list(public_path.glob("*.avi")))
-    evidence_files = len(list(evidence_path.rglob("*.enc")))
-    
     # Average file sizes
     avg_public_size = (storage_data["public"] / public_files) if public_files > 0 else 0
     avg_evidence_size = (storage_data["evidence"] / evidence_files) if evidence_files > 0 else 0
@@ -477,14 +565,13 @@ async def list_evidence_for_decrypt():
 @app.post("/api/decrypt")
 async def decrypt_evidence(request: DecryptRequest):
     """Decrypt an evidence file and return video for preview"""
-    from modules.security import SecureVault, HybridVault
-    import pickle
+    from modules.security import HybridVault
     import tempfile
     
     # 1. Generate a stable video ID based on filename and settings
     # This allows us to reuse existing decrypted files
     config_string = f"{request.filename}_{request.show_boxes}"
-    video_id = hashlib.md5(config_string.encode()).hexdigest()[:12]
+    video_id = hashlib.blake2b(config_string.encode(), digest_size=6).hexdigest()
     
     temp_dir = Path(tempfile.gettempdir()) / "secure_edge_decrypt"
     temp_dir.mkdir(exist_ok=True)
@@ -528,93 +615,13 @@ async def decrypt_evidence(request: DecryptRequest):
     is_hybrid = HybridVault.is_hybrid_format(str(filepath))
     show_boxes = request.show_boxes
     
-    def do_decrypt():
-        """Heavy decryption work - runs in thread pool"""
-        # Load vault
-        if is_hybrid:
-            private_key_path = os.getenv("RSA_PRIVATE_KEY_PATH", "keys/rsa_private.pem")
-            if not Path(private_key_path).exists():
-                raise ValueError("RSA private key not found")
-            vault = HybridVault(
-                private_key_path=private_key_path,
-                private_key_password=request.pin
-            )
-        else:
-            key_path = os.getenv("ENCRYPTION_KEY_PATH", "keys/master.key")
-            if not Path(key_path).exists():
-                raise ValueError("Encryption key not found")
-            vault = SecureVault(key_path=key_path)
-        
-        # Decrypt
-        data, metadata = vault.load_encrypted_file(str(filepath))
-        frames_data = pickle.loads(data)
-        
-        # Create video from frames
-        if frames_data:
-            first_frame_data = frames_data[0]
-            frame_key = "frame_jpg" if "frame_jpg" in first_frame_data else "frame"
-            
-            first_frame = cv2.imdecode(
-                np.frombuffer(first_frame_data[frame_key], np.uint8),
-                cv2.IMREAD_COLOR
-            )
-            h, w = first_frame.shape[:2]
-            
-            # Use H.264 codec for browser compatibility
-            codecs = ['avc1', 'X264', 'H264', 'mp4v']
-            writer = None
-            for codec in codecs:
-                fourcc = cv2.VideoWriter_fourcc(*codec)
-                writer = cv2.VideoWriter(str(temp_video_path), fourcc, 30, (w, h))
-                if writer.isOpened():
-                    break
-                writer.release()
-            
-            for frame_data in frames_data:
-                frame = cv2.imdecode(
-                    np.frombuffer(frame_data[frame_key], np.uint8),
-                    cv2.IMREAD_COLOR
-                )
-                
-                # Draw detection boxes (if enabled)
-                if show_boxes:
-                    for det in frame_data.get("detections", []):
-                        x1, y1 = det.get("x1", 0), det.get("y1", 0)
-                        x2, y2 = det.get("x2", 0), det.get("y2", 0)
-                        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                
-                writer.write(frame)
-            
-            writer.release()
-        
-        # Calculate stats
-        frame_count = metadata.get("frame_count", len(frames_data))
-        start_time = metadata.get("start_time", 0)
-        end_time = metadata.get("end_time", 0)
-        duration = end_time - start_time if end_time > start_time else frame_count / 30
-        data_hash = hashlib.sha256(data).hexdigest()
-        
-        # Save meta cache for next time
-        import json
-        with open(temp_video_path.with_suffix('.json'), 'w') as f:
-            json.dump({
-                "frame_count": frame_count,
-                "duration": duration,
-                "hash": data_hash
-            }, f)
-        
-        return {
-            "video_id": video_id,
-            "video_path": str(temp_video_path),
-            "frame_count": frame_count,
-            "duration": duration,
-            "hash": data_hash
-        }
-    
-    # Run decrypt in thread pool to avoid blocking server
-    loop = asyncio.get_event_loop()
+    # Run decrypt in a worker process so JPEG decode / video encode (which
+    # hold the GIL) cannot stall the server
     try:
-        result = await loop.run_in_executor(None, do_decrypt)
+        result = await decrypt.decrypt_evidence(
+            str(filepath), str(temp_video_path),
+            video_id, is_hybrid, show_boxes, request.pin
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -698,13 +705,14 @@ async def replay_file(filename: str, request: Request):
         end = min(end, file_size - 1)
         content_length = end - start + 1
         
-        def iter_file():
-            with open(path, "rb") as f:
-                f.seek(start)
+        async def iter_file():
+            # Async reads in 4 MiB chunks: fewer syscalls and send() calls per replay
+            async with aiofiles.open(path, "rb") as f:
+                await f.seek(start)
                 remaining = content_length
-                chunk_size = 1024 * 1024
+                chunk_size = 4 * 1024 * 1024
                 while remaining > 0:
-                    chunk = f.read(min(chunk_size, remaining))
+                    chunk = await f.read(min(chunk_size, remaining))
                     if not chunk:
                         break
                     remaining -= len(chunk)
@@ -798,7 +806,7 @@ Examples:
     if args.preset is not None:
         os.environ["DETECTION_PRESET"] = str(args.preset)
     
-    config = Config()
+    config = get_config()
     
     print("\n" + "=" * 60)
     print("  SECURE EDGE VISION SYSTEM")
@@ -0,0 +1,297 @@
+"""
+Decrypt Module
+Evidence decryption to browser-playable preview videos
+
+Jobs run in spawned worker processes. This module itself only pulls in
+crypto, OpenCV and NumPy, but spawn also re-runs the parent's __main__
+script in every worker: started as `python main.py` each worker loads the
+web server's imports too; started as `uvicorn main:app` only uvicorn's
+launcher is re-run.
+"""
+
+import os
+import json
+import pickle
+import hashlib
+import logging
+import asyncio
+import threading
+import queue
+import contextlib
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import cv2
+import numpy as np
+
+try:
+    import av  # PyAV: direct H.264 encoding for decrypted previews
+except ImportError:
+    av = None
+
+try:
+    import simplejpeg  # libjpeg-turbo bindings, faster than cv2.imdecode
+except ImportError:
+    simplejpeg = None
+
+from modules.security import SecureVault, HybridVault
+
+logger = logging.getLogger(__name__)
+
+
+# Persistent worker processes for evidence decryption, created by start()
+# (spawn avoids forking a process that holds CUDA and camera threads)
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def decode_jpeg(buf: bytes) -> np.ndarray:
+    """Decode JPEG bytes to a BGR frame (simplejpeg if installed, else OpenCV)"""
+    if simplejpeg is not None:
+        try:
+            return simplejpeg.decode_jpeg(buf, colorspace="BGR")
+        except ValueError:
+            pass  # Not a JPEG simplejpeg can read - let OpenCV try
+    return cv2.imdecode(np.frombuffer(buf, np.uint8), cv2.IMREAD_COLOR)
+
+
+class _PyAVWriter:
+    """
+    cv2.VideoWriter-like H.264 writer on PyAV
+    
+    Frames go straight to a preconfigured libav encoder, with no fourcc
+    probing and no extra copy through OpenCV's writer.
+    """
+    
+    def __init__(self, path: str, width: int, height: int, fps: int = 30):
+        self._container = av.open(path, mode="w")
+        try:
+            self._stream = self._container.add_stream("h264", rate=fps)
+            self._stream.width = width
+            self._stream.height = height
+            self._stream.pix_fmt = "yuv420p"
+        except Exception:
+            self._container.close()
+            raise
+    
+    def write(self, frame: np.ndarray) -> None:
+        video_frame = av.VideoFrame.from_ndarray(frame, format="bgr24")
+        for packet in self._stream.encode(video_frame):
+            self._container.mux(packet)
+    
+    def release(self) -> None:
+        for packet in self._stream.encode():  # Flush the encoder
+            self._container.mux(packet)
+        self._container.close()
+
+
+# Fourcc that opened last time in this process (skips re-probing)
+_working_fourcc = []
+
+
+def _open_video_writer(path: str, first_frame: np.ndarray, fps: int = 30):
+    """
+    Open an H.264 MP4 writer for decrypted previews and write first_frame
+    
+    Uses PyAV when installed (yuv420p needs even dimensions), otherwise the
+    first cv2.VideoWriter fourcc that opens.
+    """
+    h, w = first_frame.shape[:2]
+    
+    if av is not None and w % 2 == 0 and h % 2 == 0:
+        writer = None
+        try:
+            writer = _PyAVWriter(path, w, h, fps)
+            writer.write(first_frame)  # libav opens the encoder here
+            return writer
+        except Exception as e:
+            logger.warning(f"PyAV H.264 encode unavailable ({e}), using OpenCV writer")
+            if writer is not None:
+                with contextlib.suppress(Exception):
+                    writer._container.close()
+    
+    # Use H.264 codec for browser compatibility
+    codecs = _working_fourcc + ['avc1', 'X264', 'H264', 'mp4v']
+    writer = None
+    for codec in codecs:
+        fourcc = cv2.VideoWriter_fourcc(*codec)
+        writer = cv2.VideoWriter(path, fourcc, fps, (w, h))
+        if writer.isOpened():
+            _working_fourcc[:] = [codec]
+            break
+        writer.release()
+    
+    writer.write(first_frame)
+    return writer
+
+
+# (x1, y1, x2, y2) column order of a box's four corners, clockwise from top-left
+_BOX_CORNERS = [0, 1, 2, 1, 2, 3, 0, 3]
+
+
+def _decoded_frames(frames_data: list, frame_key: str, show_boxes: bool, depth: int = 8):
+    """
+    Yield decoded evidence frames, decoding on a background thread
+    
+    JPEG decode (and box drawing) overlaps with the caller's video encode;
+    the bounded queue keeps at most depth frames in memory.
+    """
+    frames = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+    
+    def put(item) -> bool:
+        """Queue item unless the consumer has gone away"""
+        while not stop.is_set():
+            try:
+                frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def decode():
+        try:
+            for frame_data in frames_data:
+                frame = decode_jpeg(frame_data[frame_key])
+                
+                # Draw detection boxes (if enabled)
+                dets = frame_data.get("detections") if show_boxes else None
+                if dets:
+                    boxes = np.array(
+                        [(d.get("x1", 0), d.get("y1", 0), d.get("x2", 0), d.get("y2", 0)) for d in dets],
+                        dtype=np.int32
+                    )
+                    # All boxes in one call; same pixels as cv2.rectangle per box
+                    cv2.polylines(frame, boxes[:, _BOX_CORNERS].reshape(-1, 4, 2), True, (0, 255, 0), 2)
+                
+                if not put(frame):
+                    return
+        except Exception as e:
+            put(e)
+        else:
+            put(done)
+    
+    decoder = threading.Thread(target=decode, daemon=True)
+    decoder.start()
+    
+    try:
+        while True:
+            item = frames.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Consumer finished, failed or closed us early - release the decoder
+        stop.set()
+        decoder.join()
+
+
+def decrypt_to_video(filepath: str, temp_video_path: str, video_id: str,
+                     is_hybrid: bool, show_boxes: bool, pin: Optional[str]) -> dict:
+    """
+    Heavy decryption work - runs in the decrypt worker processes
+    
+    Module-level (picklable) so it can be sent to a subprocess; decodes the
+    evidence frames and writes the preview video to temp_video_path.
+    """
+    temp_video_path = Path(temp_video_path)
+    
+    # Load vault
+    if is_hybrid:
+        private_key_path = os.getenv("RSA_PRIVATE_KEY_PATH", "keys/rsa_private.pem")
+        if not Path(private_key_path).exists():
+            raise ValueError("RSA private key not found")
+        vault = HybridVault(
+            private_key_path=private_key_path,
+            private_key_password=pin
+        )
+    else:
+        key_path = os.getenv("ENCRYPTION_KEY_PATH", "keys/master.key")
+        if not Path(key_path).exists():
+            raise ValueError("Encryption key not found")
+        vault = SecureVault(key_path=key_path)
+
+    # Decrypt
+    data, metadata = vault.load_encrypted_file(str(filepath))
+    # Hash and unpickle straight away, then drop the plaintext so it is not
+    # held through the decode/encode below
+    data_hash = hashlib.sha256(data).hexdigest()
+    frames_data = pickle.loads(data)
+    del data
+
+    # Create video from frames
+    if frames_data:
+        first_frame_data = frames_data[0]
+        frame_key = "frame_jpg" if "frame_jpg" in first_frame_data else "frame"
+
+        # Frames are decoded (and annotated) ahead on a worker thread
+        frames = _decoded_frames(frames_data, frame_key, show_boxes)
+        first_frame = next(frames)
+
+        # H.264 for browser compatibility (writes first_frame)
+        try:
+            writer = _open_video_writer(str(temp_video_path), first_frame)
+            for frame in frames:
+                writer.write(frame)
+
+            writer.release()
+        finally:
+            frames.close()  # Stops the decode thread if writing failed
+
+    # Calculate stats
+    frame_count = metadata.get("frame_count", len(frames_data))
+    start_time = metadata.get("start_time", 0)
+    end_time = metadata.get("end_time", 0)
+    duration = end_time - start_time if end_time > start_time else frame_count / 30
+
+    # Save meta cache for next time
+    with open(temp_video_path.with_suffix('.json'), 'w') as f:
+        json.dump({
+            "frame_count": frame_count,
+            "duration": duration,
+            "hash": data_hash
+        }, f)
+
+    return {
+        "video_id": video_id,
+        "video_path": str(temp_video_path),
+        "frame_count": frame_count,
+        "duration": duration,
+        "hash": data_hash
+    }
+
+
+def start() -> ProcessPoolExecutor:
+    """Create the decrypt worker pool if it is not running (workers spawn on first job)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, (os.cpu_count() or 2) // 2),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+async def decrypt_evidence(filepath: str, temp_video_path: str, video_id: str,
+                           is_hybrid: bool, show_boxes: bool, pin: Optional[str]) -> dict:
+    """Run decrypt_to_video in the worker pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        start(), decrypt_to_video, filepath, temp_video_path,
+        video_id, is_hybrid, show_boxes, pin
+    )
+
+
+def shutdown() -> None:
+    """Stop the decrypt workers, dropping queued jobs; start() makes a new pool"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,72 @@
+"""
+Download Module
+Parallel HTTP downloads for the model and codec setup scripts
+"""
+
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def parallel_download(url, path, reporthook=None, stripes=4, chunk_size=1 << 18):
+    """
+    Download url to path using parallel HTTP Range requests.
+
+    The file is split into `stripes` byte ranges fetched on separate
+    connections. Falls back to urllib.request.urlretrieve when the server
+    does not advertise range support, the size is unknown, the HEAD probe
+    is rejected (e.g. presigned S3 redirects answering 403/405) or a range
+    request is answered without 206.
+    reporthook has the same (block_num, block_size, total_size) signature
+    as for urlretrieve.
+    """
+    try:
+        done = _striped_download(url, path, reporthook, stripes, chunk_size)
+    except OSError:  # URLError/HTTPError from the probe, or a stripe without 206
+        done = False
+
+    if not done:
+        urllib.request.urlretrieve(url, path, reporthook=reporthook)
+
+
+def _striped_download(url, path, reporthook, stripes, chunk_size) -> bool:
+    """Fetch url in parallel byte ranges; False if the server can't serve ranges"""
+    head = urllib.request.Request(url, method="HEAD")
+    with urllib.request.urlopen(head) as resp:
+        final_url = resp.geturl()
+        total = int(resp.headers.get("Content-Length") or 0)
+        ranges_ok = resp.headers.get("Accept-Ranges", "").lower() == "bytes"
+
+    if not ranges_ok or total < stripes * chunk_size:
+        return False
+
+    with open(path, "wb") as f:
+        f.truncate(total)
+
+    lock = threading.Lock()
+    downloaded = 0
+
+    def fetch(start, end):
+        nonlocal downloaded
+        req = urllib.request.Request(final_url, headers={"Range": f"bytes={start}-{end}"})
+        with urllib.request.urlopen(req) as resp, open(path, "r+b") as f:
+            if resp.status != 206:
+                raise IOError(f"Server ignored Range request (HTTP {resp.status})")
+            f.seek(start)
+            while True:
+                chunk = resp.read(chunk_size)
+                if not chunk:
+                    break
+                f.write(chunk)
+                if reporthook:
+                    with lock:
+                        downloaded += len(chunk)
+                        reporthook(downloaded, 1, total)
+
+    step = -(-total // stripes)
+    with ThreadPoolExecutor(max_workers=stripes) as pool:
+        futures = [pool.submit(fetch, start, min(start + step, total) - 1)
+                   for start in range(0, total, step)]
+        for future in futures:
+            future.result()
+    return True
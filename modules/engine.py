@@ -45,6 +45,7 @@ Thread Model:
     - Each camera has its own processing thread
     - Threads share single FrameProcessor (GPU memory optimization)
     - Frame locks protect shared state (latest_frames dict)
+    - Each new frame is JPEG-encoded at most once, shared by all stream viewers
     - Auto-reconnect on camera disconnect
 
 Usage:
@@ -68,17 +69,22 @@ License: MIT
 
 import os
 import time
+import asyncio
 import logging
 import threading
 import contextlib
 from datetime import datetime
 from typing import Optional, Dict, Tuple, Any
-from pathlib import Path
 
 import cv2
 import numpy as np
 
-from config import Config
+try:
+    import simplejpeg  # libjpeg-turbo bindings, faster than cv2.imencode
+except ImportError:
+    simplejpeg = None
+
+from config import Config, get_config
 from modules.processor import FrameProcessor
 from modules.recorder import VideoRecorder
 from modules.evidence import EvidenceManager
@@ -134,7 +140,7 @@ class EdgeVisionSystem:
     """
     
     def __init__(self, config: Optional[Config] = None):
-        self.config = config or Config()
+        self.config = config or get_config()
         self.running = False
         
         # Components (one per camera)
@@ -149,6 +155,16 @@ class EdgeVisionSystem:
         self.camera_fps = {} # {camera_idx: fps}
         self.camera_status = {} # {camera_idx: "online" | "offline" | "connecting"}
         self.frame_locks = {} # {camera_idx: Lock}
+        self.frame_ids = {} # {camera_idx: count of frames published}
+        
+        # Shared MJPEG encode: one per new frame, reused by every stream viewer
+        self.latest_jpeg = {} # {camera_idx: (frame_id, jpeg bytes)}
+        self.jpeg_locks = {} # {camera_idx: Lock}
+        
+        # Stream wakeups: notified from processing threads on each new frame
+        self.loop = None  # Event loop of the web server (see attach_loop)
+        self.frame_conditions = {} # {camera_idx: asyncio.Condition}
+        self.stream_viewers = {} # {camera_idx: open streams} (event loop only)
         
         # FPS Stats handlers
         self.frame_counts = {}
@@ -183,6 +199,8 @@ class EdgeVisionSystem:
             
             self.caps[i] = None # Will be opened in thread
             self.frame_locks[i] = threading.Lock()
+            self.jpeg_locks[i] = threading.Lock()
+            self.frame_ids[i] = 0
             self.latest_frames[i] = None
             self.latest_detections[i] = 0
             self.camera_fps[i] = 0
@@ -202,7 +220,7 @@ class EdgeVisionSystem:
             )
             
             self.evidence_managers[i] = EvidenceManager(
-                output_dir=Path(self.config.evidence_path) / prefix,
+                output_dir=self.config.evidence_path / prefix,
                 key_path=self.config.key_path,
                 max_duration=self.config.max_duration,
                 prefix=prefix,
@@ -290,6 +308,9 @@ class EdgeVisionSystem:
         with self.frame_locks[camera_idx]:
             self.latest_frames[camera_idx] = blurred.copy()
             self.latest_detections[camera_idx] = len(detections)
+            self.frame_ids[camera_idx] += 1
+        
+        self._notify_frame(camera_idx)
         
         return True
 
@@ -354,10 +375,70 @@ class EdgeVisionSystem:
                 return self.latest_frames[camera_idx].copy(), self.latest_detections[camera_idx], self.camera_fps.get(camera_idx, 0)
             return None, 0, 0
     
+    def attach_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Create per-camera frame conditions on the server's event loop"""
+        self.loop = loop
+        self.frame_conditions = {i: asyncio.Condition() for i in self.frame_locks}
+    
+    def _notify_frame(self, camera_idx: Optional[int] = None) -> None:
+        """Wake stream coroutines waiting on a camera (all cameras if None)"""
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        
+        # Only hop onto the event loop for cameras someone is streaming
+        targets = [i for i in (self.frame_conditions if camera_idx is None else (camera_idx,))
+                   if self.stream_viewers.get(i) and i in self.frame_conditions]
+        if not targets:
+            return
+        
+        async def notify():
+            for i in targets:
+                cond = self.frame_conditions[i]
+                async with cond:
+                    cond.notify_all()
+        
+        asyncio.run_coroutine_threadsafe(notify(), loop)
+    
+    @contextlib.contextmanager
+    def viewing(self, camera_idx: int):
+        """Count an open stream of camera_idx so new frames notify it"""
+        self.stream_viewers[camera_idx] = self.stream_viewers.get(camera_idx, 0) + 1
+        try:
+            yield
+        finally:
+            self.stream_viewers[camera_idx] -= 1
+    
+    def get_jpeg(self, camera_idx: int) -> Tuple[Optional[bytes], int]:
+        """
+        Get latest frame as JPEG for streaming, with its frame id
+        
+        The frame is encoded once, by the first viewer to ask for it; other
+        viewers of the same camera reuse the bytes. Nothing is encoded while
+        nobody is watching.
+        """
+        if camera_idx not in self.frame_locks:
+            return None, 0
+        
+        with self.jpeg_locks[camera_idx]:
+            with self.frame_locks[camera_idx]:
+                frame = self.latest_frames[camera_idx]
+                frame_id = self.frame_ids[camera_idx]
+            if frame is None:
+                return None, frame_id
+            
+            # latest_frames entries are replaced, never modified, so frame
+            # can be encoded outside the frame lock
+            cached = self.latest_jpeg.get(camera_idx)
+            if cached is None or cached[0] != frame_id:
+                cached = self.latest_jpeg[camera_idx] = (frame_id, encode_jpeg(frame, 85))
+            return cached[1], frame_id
+    
     def stop(self) -> None:
         """Stop all components"""
         logger.info("Stopping system...")
         self.running = False
+        self._notify_frame()  # Let waiting streams see running == False
         
         for idx, cap in self.caps.items():
             if cap is not None:
@@ -374,6 +455,16 @@ class EdgeVisionSystem:
         logger.info("System stopped")
 
 
+def encode_jpeg(frame: np.ndarray, quality: int = 85) -> bytes:
+    """Encode a BGR frame to JPEG bytes (simplejpeg if installed, else OpenCV)"""
+    if simplejpeg is not None:
+        return simplejpeg.encode_jpeg(
+            np.ascontiguousarray(frame), quality=quality, colorspace="BGR", fastdct=True
+        )
+    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer.tobytes()
+
+
 # ============================================================
 # Global Instance
 # ============================================================
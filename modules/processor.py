@@ -63,6 +63,24 @@ import numpy as np
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Detector input size; frames are shrunk to this on the long edge before predict
+INFER_SIZE = 640
+
+
+def resize_for_inference(frame: np.ndarray, size: int = INFER_SIZE) -> Tuple[np.ndarray, float]:
+    """
+    Downscale frame so its longer edge is at most size pixels
+    
+    Returns:
+        (resized_frame, scale) where scale maps original to resized coordinates
+    """
+    h, w = frame.shape[:2]
+    scale = size / max(h, w)
+    if scale >= 1.0:
+        return frame, 1.0
+    small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_LINEAR)
+    return small, scale
+
 
 class FrameProcessor:
     """
@@ -84,6 +102,9 @@ class FrameProcessor:
         device (str): Compute device ("cuda" or "cpu")
         confidence (float): Detection confidence threshold
         blur_intensity (int): Gaussian blur kernel size
+        half (bool): Run inference in FP16 (CUDA only)
+        fused_blur (bool): Blur the frame once and composite all face regions
+            through a mask instead of blurring each region separately
         is_face_model (bool): True if using dedicated face detection model
         
     Detection Output Format:
@@ -114,7 +135,9 @@ class FrameProcessor:
         iou: float = 0.45,
         blur_intensity: int = 51,
         tracker: str = "botsort",
-        use_face_detection: bool = True  # Kept for compatibility
+        use_face_detection: bool = True,  # Kept for compatibility
+        half: bool = False,
+        fused_blur: bool = False
     ):
         # Get absolute path relative to this file's directory
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -142,6 +165,8 @@ class FrameProcessor:
         self.iou = iou
         self.blur_intensity = blur_intensity if blur_intensity % 2 == 1 else blur_intensity + 1
         self.tracker = tracker
+        self.half = half
+        self.fused_blur = fused_blur
         
         self.model = None
         self._is_loaded = False
@@ -151,8 +176,14 @@ class FrameProcessor:
         self._last_time = 0
         self._timeout = 0.3  # Keep faces for 300ms after lost
     
-    def load_model(self) -> bool:
-        """Load YOLOv8 model"""
+    def load_model(self, model=None) -> bool:
+        """
+        Load YOLOv8 model
+        
+        Args:
+            model: Already loaded (and warmed up) YOLO model to use instead
+                   of loading model_path
+        """
         if self._is_loaded:
             return True
         
@@ -169,13 +200,18 @@ class FrameProcessor:
                     logger.warning("CUDA not available")
             
             # Load model
-            self.model = YOLO(self.model_path)
+            if model is None:
+                self.model = YOLO(self.model_path)
+            else:
+                self.model = model
             logger.info(f"Loaded: {self.model_path} ({'Face' if self.is_face_model else 'Person'} model)")
             logger.info(f"Detection config: conf={self.confidence}, iou={self.iou}, tracker={self.tracker}")
             
-            # Warm up
-            dummy = np.zeros((480, 480, 3), dtype=np.uint8)
-            self.model.predict(dummy, device=self.device, verbose=False)
+            # Warm up (same half setting as _detect_faces - fixed on first call)
+            if model is None:
+                dummy = np.zeros((480, 480, 3), dtype=np.uint8)
+                self.model.predict(dummy, device=self.device, verbose=False,
+                                   half=self.half and self.device == "cuda")
             
             self._is_loaded = True
             logger.info(f"Processor ready on {self.device.upper()}")
@@ -185,6 +221,56 @@ class FrameProcessor:
             logger.error(f"Load error: {e}")
             return False
     
+    def _predict(self, source):
+        """Run the detector on one frame or a list of frames"""
+        return self.model.predict(
+            source,
+            device=self.device,
+            conf=self.confidence,
+            iou=self.iou,
+            verbose=False,
+            imgsz=INFER_SIZE,  # Good balance of speed/accuracy
+            half=self.half and self.device == "cuda"
+        )
+    
+    def _faces_from_result(self, result, h: int, w: int, now: float,
+                           scale: float = 1.0) -> List[dict]:
+        """
+        Convert one YOLO result into face detections for an h x w frame
+        
+        scale is the factor the frame was shrunk by before inference; boxes
+        are mapped back to full resolution.
+        """
+        faces = []
+        
+        if result.boxes is not None:
+            for box in result.boxes:
+                x1, y1, x2, y2 = map(int, box.xyxy[0].cpu().numpy() / scale)
+                conf = float(box.conf[0].cpu().numpy())
+                
+                # If using person model, estimate face region
+                if not self.is_face_model:
+                    # Face is upper 30% of person box
+                    person_h = y2 - y1
+                    y2 = y1 + int(person_h * 0.30)
+                
+                # Ensure valid bounds
+                x1 = max(0, x1)
+                y1 = max(0, y1)
+                x2 = min(w, x2)
+                y2 = min(h, y2)
+                
+                if x2 > x1 and y2 > y1:
+                    faces.append({
+                        "x1": x1, "y1": y1,
+                        "x2": x2, "y2": y2,
+                        "class": "face" if self.is_face_model else "person",
+                        "confidence": conf,
+                        "timestamp": now
+                    })
+        
+        return faces
+    
     def _detect_faces(self, frame: np.ndarray) -> List[dict]:
         """Detect faces in frame"""
         h, w = frame.shape[:2]
@@ -192,43 +278,12 @@ class FrameProcessor:
         
         try:
             # Run detection with confidence and IoU thresholds
-            results = self.model.predict(
-                frame,
-                device=self.device,
-                conf=self.confidence,
-                iou=self.iou,
-                verbose=False,
-                imgsz=640  # Good balance of speed/accuracy
-            )
+            small, scale = resize_for_inference(frame)
+            results = self._predict(small)
             
             faces = []
-            
             for result in results:
-                if result.boxes is not None:
-                    for box in result.boxes:
-                        x1, y1, x2, y2 = map(int, box.xyxy[0].cpu().numpy())
-                        conf = float(box.conf[0].cpu().numpy())
-                        
-                        # If using person model, estimate face region
-                        if not self.is_face_model:
-                            # Face is upper 30% of person box
-                            person_h = y2 - y1
-                            y2 = y1 + int(person_h * 0.30)
-                        
-                        # Ensure valid bounds
-                        x1 = max(0, x1)
-                        y1 = max(0, y1)
-                        x2 = min(w, x2)
-                        y2 = min(h, y2)
-                        
-                        if x2 > x1 and y2 > y1:
-                            faces.append({
-                                "x1": x1, "y1": y1,
-                                "x2": x2, "y2": y2,
-                                "class": "face" if self.is_face_model else "person",
-                                "confidence": conf,
-                                "timestamp": now
-                            })
+                faces.extend(self._faces_from_result(result, h, w, now, scale))
             
             # Tracking removed for thread safety in multi-camera setup
             # Each thread calls this concurrently, so shared state causes "ghost" detections
@@ -238,11 +293,23 @@ class FrameProcessor:
             logger.error(f"Detection error: {e}")
             return []
     
-    def _apply_blur(self, frame: np.ndarray, faces: List[dict]) -> np.ndarray:
-        """Apply Gaussian blur to face regions"""
-        blurred = frame.copy()
+    def _apply_blur(self, frame: np.ndarray, faces: List[dict],
+                    out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Apply Gaussian blur to face regions
+        
+        If out is given (same shape and dtype as frame) the result is written
+        into it instead of a freshly allocated copy.
+        """
+        if out is not None and out.shape == frame.shape and out.dtype == frame.dtype:
+            np.copyto(out, frame)
+            blurred = out
+        else:
+            blurred = frame.copy()
         h, w = frame.shape[:2]
+        ksize = (self.blur_intensity, self.blur_intensity)
         
+        regions = []
         for face in faces:
             x1, y1, x2, y2 = face["x1"], face["y1"], face["x2"], face["y2"]
             
@@ -257,24 +324,39 @@ class FrameProcessor:
             y2 = min(h, y2 + pad_y)
             
             if x2 > x1 and y2 > y1:
-                roi = blurred[y1:y2, x1:x2]
-                blurred_roi = cv2.GaussianBlur(
-                    roi,
-                    (self.blur_intensity, self.blur_intensity),
-                    0
-                )
-                blurred[y1:y2, x1:x2] = blurred_roi
+                regions.append((x1, y1, x2, y2))
                 
                 # Draw Visual Indicator (Green Box) - REMOVED per user request
                 # This makes the "movement" visible while keeping identity protected
                 # cv2.rectangle(blurred, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                
+        
+        if self.fused_blur and regions:
+            # One full-frame blur composited through a mask of all regions
+            mask = np.zeros((h, w, 1), dtype=bool)
+            for x1, y1, x2, y2 in regions:
+                mask[y1:y2, x1:x2] = True
+            np.copyto(blurred, cv2.GaussianBlur(frame, ksize, 0), where=mask)
+        else:
+            for x1, y1, x2, y2 in regions:
+                roi = blurred[y1:y2, x1:x2]
+                cv2.GaussianBlur(roi, ksize, 0, dst=roi)
+        
         return blurred
     
-    def process(self, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray, List[dict]]:
+    def apply_blur(self, frame: np.ndarray, faces: List[dict],
+                   out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Blur known face regions without running detection (e.g. reusing earlier boxes)"""
+        return self._apply_blur(frame, faces, out)
+    
+    def process(self, frame: np.ndarray,
+                out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, List[dict]]:
         """
         Process frame: detect faces and apply blur
         
+        Args:
+            frame: BGR input frame
+            out: Optional preallocated buffer reused for the blurred frame
+        
         Returns:
             (blurred_frame, raw_frame, detections_list)
         """
@@ -283,10 +365,44 @@ class FrameProcessor:
                 return frame, frame, []
         
         faces = self._detect_faces(frame)
-        blurred = self._apply_blur(frame, faces)
+        blurred = self._apply_blur(frame, faces, out)
         
         return blurred, frame, faces
     
+    def process_batch(self, frames: List[np.ndarray],
+                      out: Optional[List[np.ndarray]] = None) -> List[Tuple[np.ndarray, np.ndarray, List[dict]]]:
+        """
+        Process several frames with a single detector call
+        
+        Args:
+            frames: BGR input frames
+            out: Optional preallocated buffers, one per frame, reused for the blurred frames
+        
+        Returns:
+            One (blurred_frame, raw_frame, detections_list) per input frame
+        """
+        if not self._is_loaded:
+            if not self.load_model():
+                return [(frame, frame, []) for frame in frames]
+        
+        now = time.time()
+        resized = [resize_for_inference(frame) for frame in frames]
+        try:
+            results = self._predict([small for small, _ in resized])
+        except Exception as e:
+            logger.error(f"Detection error: {e}")
+            results = [None] * len(frames)
+        
+        outputs = []
+        for i, (frame, result) in enumerate(zip(frames, results)):
+            h, w = frame.shape[:2]
+            scale = resized[i][1]
+            faces = self._faces_from_result(result, h, w, now, scale) if result is not None else []
+            buf = out[i] if out is not None and i < len(out) else None
+            outputs.append((self._apply_blur(frame, faces, buf), frame, faces))
+        
+        return outputs
+    
     def get_info(self) -> dict:
         """Get processor info"""
         return {
@@ -297,5 +413,7 @@ class FrameProcessor:
             "iou": self.iou,
             "blur_intensity": self.blur_intensity,
             "tracker": self.tracker,
+            "half": self.half,
+            "fused_blur": self.fused_blur,
             "is_loaded": self._is_loaded
         }
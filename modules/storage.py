@@ -361,6 +361,33 @@ def get_recording_list(directory: str) -> List[dict]:
     return recordings
 
 
+def scan_files(root: str):
+    """
+    Yield (mtime, path, size) for every file with an extension under root
+    
+    Walks with os.scandir so the file/dir type comes from the directory
+    listing itself; only one stat per file is needed for size and mtime.
+    """
+    stack = [str(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue  # Directory removed since it was listed
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    if "." not in entry.name or not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # File removed mid-scan (e.g. rotated away)
+                yield stat.st_mtime, entry.path, stat.st_size
+
+
 def cleanup_storage(public_path: str, evidence_path: str, max_gb: int):
     """
     Enforce storage retention policy (FIFO)
@@ -371,23 +398,11 @@ def cleanup_storage(public_path: str, evidence_path: str, max_gb: int):
         all_files = []
         total_size = 0
         
-        # Scan Public
-        p_path = Path(public_path)
-        if p_path.exists():
-            for f in p_path.rglob("*.*"):
-                if f.is_file():
-                    stat = f.stat()
-                    all_files.append((stat.st_mtime, f, stat.st_size))
-                    total_size += stat.st_size
-                    
-        # Scan Evidence
-        e_path = Path(evidence_path)
-        if e_path.exists():
-            for f in e_path.rglob("*.*"):
-                if f.is_file():
-                    stat = f.stat()
-                    all_files.append((stat.st_mtime, f, stat.st_size))
-                    total_size += stat.st_size
+        # Scan Public and Evidence
+        for root in (public_path, evidence_path):
+            for mtime, f, size in scan_files(root):
+                all_files.append((mtime, f, size))
+                total_size += size
         
         if total_size <= max_bytes:
             return total_size
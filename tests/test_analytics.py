@@ -0,0 +1,62 @@
+"""
+Tests for Analytics Caching
+Tests that the analytics payload is reused until recordings change
+"""
+
+import os
+import sys
+import json
+import tempfile
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+@pytest.fixture
+def public_dir():
+    """Public recordings directory with one metadata file and a fresh cache"""
+    import main
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        (Path(tmpdir) / "public_cam0_1.json").write_text(json.dumps({"detections": []}))
+        
+        with patch.dict(os.environ, {"PUBLIC_RECORDINGS_PATH": tmpdir}), \
+             patch.dict(main._analytics_cache, {"ts": 0.0, "fingerprint": None, "payload": None, "cleanup_ts": 0.0}), \
+             patch.object(main, "_compute_analytics", side_effect=lambda system, run_cleanup=True: {}) as compute:
+            yield Path(tmpdir), compute
+
+
+class TestCachedAnalytics:
+    """Tests for _cached_analytics"""
+    
+    def test_unchanged_tree_returns_cached_payload(self, public_dir):
+        """Test that an unchanged tree inside the TTL reuses the same payload"""
+        from main import _cached_analytics
+        
+        _, compute = public_dir
+        
+        first = _cached_analytics(None)
+        
+        assert _cached_analytics(None) is first
+        assert compute.call_count == 1
+    
+    def test_new_metadata_invalidates_cache(self, public_dir):
+        """Test that a new .json file forces a recompute inside the TTL"""
+        from main import _cached_analytics
+        
+        path, compute = public_dir
+        
+        first = _cached_analytics(None)
+        (path / "public_cam0_2.json").write_text(json.dumps({"detections": []}))
+        second = _cached_analytics(None)
+        
+        assert second is not first
+        assert compute.call_count == 2
+        # The change also triggers a retention check
+        assert compute.call_args.args[1] is True
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
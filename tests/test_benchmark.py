@@ -0,0 +1,144 @@
+"""
+Tests for Benchmark Helpers
+Tests sample storage, statistics and box tracking of the benchmark script
+"""
+
+import sys
+import pytest
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _add(result, i):
+    """Add a sample whose metrics are i, i+1, ... i+5"""
+    result.add_sample(
+        latency=i, fps=i + 1, gpu_util=i + 2,
+        detection_time=i + 3, blur_time=i + 4, detection_count=i + 5
+    )
+
+
+class TestBenchmarkResult:
+    """Tests for BenchmarkResult sample matrix"""
+    
+    def test_matrix_layout(self):
+        """Test that metrics are rows and samples are columns"""
+        from benchmark import BenchmarkResult
+        
+        result = BenchmarkResult(max_samples=4)
+        _add(result, 0)
+        _add(result, 10)
+        
+        assert len(result) == 2
+        assert result._data.shape == (len(BenchmarkResult.METRICS), 4)
+        assert result._data.dtype == np.float32
+        np.testing.assert_array_equal(result._data[:, 1], [10, 11, 12, 13, 14, 15])
+        np.testing.assert_array_equal(result.latencies, [0, 10])
+        np.testing.assert_array_equal(result.fps_samples, [1, 11])
+        np.testing.assert_array_equal(result.gpu_utilizations, [2, 12])
+        np.testing.assert_array_equal(result.detection_times, [3, 13])
+        np.testing.assert_array_equal(result.blur_times, [4, 14])
+        np.testing.assert_array_equal(result.frame_counts, [5, 15])
+    
+    def test_grows_past_preallocated_size(self):
+        """Test that samples beyond max_samples are kept"""
+        from benchmark import BenchmarkResult
+        
+        result = BenchmarkResult(max_samples=2)
+        for i in range(5):
+            _add(result, i)
+        
+        assert len(result) == 5
+        assert result._data.shape[1] >= 5
+        np.testing.assert_array_equal(result.latencies, [0, 1, 2, 3, 4])
+        np.testing.assert_array_equal(result.frame_counts, [5, 6, 7, 8, 9])
+    
+    def test_grows_from_zero_capacity(self):
+        """Test that a result preallocated with no room still accepts samples"""
+        from benchmark import BenchmarkResult
+        
+        result = BenchmarkResult(max_samples=0)
+        for i in range(3):
+            _add(result, i)
+        
+        np.testing.assert_array_equal(result.latencies, [0, 1, 2])
+    
+    def test_summary_per_metric(self):
+        """Test that summary reduces each metric row over the valid samples"""
+        from benchmark import BenchmarkResult
+        
+        result = BenchmarkResult(max_samples=8)
+        for i in (0, 10, 20):
+            _add(result, i)
+        
+        summary = result.summary()
+        
+        assert list(summary) == list(BenchmarkResult.METRICS)
+        assert summary["latency_ms"] == pytest.approx(
+            {"min": 0, "max": 20, "avg": 10, "std": np.std([0, 10, 20])}
+        )
+        assert summary["detections_per_frame"]["min"] == 5
+        assert summary["detections_per_frame"]["max"] == 25
+    
+    def test_summary_empty(self):
+        """Test that an empty result summarizes to zeros"""
+        from benchmark import BenchmarkResult
+        
+        summary = BenchmarkResult().summary()
+        
+        assert summary["fps"] == {"min": 0, "max": 0, "avg": 0, "std": 0}
+
+
+class TestBoxTracking:
+    """Tests for box_iou and BoxTracker"""
+    
+    def test_box_iou(self):
+        """Test IoU of identical, overlapping and disjoint boxes"""
+        from benchmark import box_iou
+        
+        a = np.array([[0, 0, 10, 10]], dtype=np.float32)
+        b = np.array([
+            [0, 0, 10, 10],     # Identical
+            [5, 0, 15, 10],     # Half overlap: 50 / 150
+            [20, 20, 30, 30],   # Disjoint
+            [10, 0, 20, 10],    # Touching edge only
+        ], dtype=np.float32)
+        
+        iou = box_iou(a, b)
+        
+        assert iou.shape == (1, 4)
+        np.testing.assert_allclose(iou[0], [1.0, 1 / 3, 0.0, 0.0], rtol=1e-6)
+    
+    def test_box_iou_empty(self):
+        """Test that empty inputs give an empty matrix"""
+        from benchmark import box_iou
+        
+        iou = box_iou(np.empty((0, 4), np.float32), np.ones((3, 4), np.float32))
+        
+        assert iou.shape == (0, 3)
+    
+    def test_tracker_extrapolates_linked_boxes(self):
+        """Test that a matched box moves with its per-frame velocity"""
+        from benchmark import BoxTracker
+        
+        tracker = BoxTracker()
+        tracker.update(np.array([[0, 0, 10, 10]], dtype=np.float32), 1)
+        tracker.update(np.array([[4, 0, 14, 10]], dtype=np.float32), 2)
+        
+        np.testing.assert_allclose(tracker.predict(), [[6, 0, 16, 10]])
+        np.testing.assert_allclose(tracker.predict(), [[8, 0, 18, 10]])
+    
+    def test_tracker_keeps_new_boxes_still(self):
+        """Test that boxes without a match below the IoU threshold stay put"""
+        from benchmark import BoxTracker
+        
+        tracker = BoxTracker(iou_threshold=0.3)
+        tracker.update(np.array([[0, 0, 10, 10]], dtype=np.float32), 1)
+        tracker.update(np.array([[50, 50, 60, 60]], dtype=np.float32), 1)
+        
+        np.testing.assert_allclose(tracker.predict(), [[50, 50, 60, 60]])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -68,6 +68,18 @@ class TestPresetLoading:
         assert 2 in presets
         assert presets[1]["detector"] == "yolov8n-face"
         assert presets[2]["detector"] == "yolov11n-face"
+    
+    def test_load_presets_is_cached(self):
+        """Test that presets are parsed once and reload_presets clears the cache"""
+        from config import load_presets, reload_presets
+        
+        reload_presets()
+        first = load_presets()
+        
+        assert load_presets() is first
+        
+        reload_presets()
+        assert load_presets() is not first
 
 
 class TestConfigWithPresets:
@@ -144,6 +156,28 @@ class TestConfigWithPresets:
         
         assert config.preset_id == 1
     
+    def test_config_from_env_snapshot(self):
+        """Test that Config reads settings from an explicit env mapping"""
+        from config import Config
+        
+        config = Config(env={"DETECTION_PRESET": "2", "CAMERA_SOURCES": "0,rtsp://cam"})
+        
+        assert config.preset_id == 2
+        assert config.camera_sources == [0, "rtsp://cam"]
+        assert config.blur_intensity == 51
+    
+    @pytest.mark.parametrize("value, expected", [
+        ("0", 3), ("1", 3), ("2", 3), ("3", 3),
+        ("4", 5), ("50", 51), ("51", 51), ("99", 99),
+    ])
+    def test_config_blur_intensity_is_odd(self, value, expected):
+        """Test that BLUR_INTENSITY is rounded up to an odd kernel of at least 3"""
+        from config import Config
+        
+        config = Config(env={"BLUR_INTENSITY": value})
+        
+        assert config.blur_intensity == expected
+    
     def test_config_preset_info(self):
         """Test get_preset_info method"""
         from config import Config
@@ -196,6 +230,49 @@ class TestConfigWithPresets:
                 os.environ["DETECTION_IOU"] = env_backup
 
 
+class TestEnvHelpers:
+    """Tests for environment parsing helpers"""
+    
+    @pytest.mark.parametrize("value, expected", [
+        ("1", True), ("true", True), ("yes", True), ("on", True),
+        ("YES", True), ("TrUe", True), (" on ", True), ("\tyes\n", True),
+        ("0", False), ("false", False), ("no", False), ("off", False), ("", False),
+    ])
+    def test_env_bool(self, value, expected):
+        """Test accepted spellings, case and surrounding whitespace"""
+        from config import _env_bool
+        
+        assert _env_bool({"FLAG": value}, "FLAG", not expected) is expected
+    
+    def test_env_bool_missing_uses_default(self):
+        """Test that an unset variable returns the default"""
+        from config import _env_bool
+        
+        assert _env_bool({}, "FLAG", True) is True
+        assert _env_bool({}, "FLAG", False) is False
+    
+    @pytest.mark.parametrize("value, expected", [
+        ("0", 0), (" 2 ", 2), ("10", 10),
+        ("rtsp://cam/stream", "rtsp://cam/stream"), ("video.mp4", "video.mp4"),
+        ("\u00b2", "\u00b2"),  # Superscript two: isdigit() but not a decimal
+        ("\u0661", "\u0661"),  # Arabic-Indic one: decimal but not ASCII
+    ])
+    def test_parse_camera_source(self, value, expected):
+        """Test that only ASCII digits become camera indexes"""
+        from config import parse_camera_source
+        
+        assert parse_camera_source(value) == expected
+        assert type(parse_camera_source(value)) is type(expected)
+    
+    def test_config_rejects_non_ascii_camera_index(self):
+        """Test that Config keeps non-ASCII digit sources as strings"""
+        from config import Config
+        
+        config = Config(env={"CAMERA_SOURCES": "1, \u0661"})
+        
+        assert config.camera_sources == [1, "\u0661"]
+
+
 class TestPresetIntegration:
     """Integration tests for preset system"""
     
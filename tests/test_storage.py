@@ -148,5 +148,53 @@ class TestGetRecordingList:
             assert all(r["filename"].endswith(".mp4") for r in recordings)
 
 
+class TestScanFiles:
+    """Tests for scan_files and cleanup_storage"""
+    
+    def test_scan_nested_directories(self):
+        """Test that nested files are found and dotless names skipped"""
+        from modules.storage import scan_files
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            nested = Path(tmpdir) / "cam0" / "2024-01-01"
+            nested.mkdir(parents=True)
+            (Path(tmpdir) / "top.mp4").write_bytes(b"a" * 10)
+            (nested / "deep.enc").write_bytes(b"b" * 20)
+            (nested / "LOCK").write_bytes(b"c" * 30)
+            
+            found = {os.path.basename(path): size for _, path, size in scan_files(tmpdir)}
+            
+            assert found == {"top.mp4": 10, "deep.enc": 20}
+    
+    def test_scan_missing_directory(self):
+        """Test that a missing root yields nothing"""
+        from modules.storage import scan_files
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            assert list(scan_files(os.path.join(tmpdir, "missing"))) == []
+    
+    def test_cleanup_deletes_oldest_first(self):
+        """Test that retention removes the oldest files until under 90%"""
+        from modules.storage import cleanup_storage
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            public = Path(tmpdir) / "public"
+            evidence = Path(tmpdir) / "evidence" / "cam0"
+            public.mkdir()
+            evidence.mkdir(parents=True)
+            
+            files = [public / "b.mp4", evidence / "a.enc", public / "c.mp4"]
+            for age, filepath in enumerate(files):
+                filepath.write_bytes(b"x" * 1000)
+                os.utime(filepath, (1000 + age, 1000 + age))
+            
+            # 3000 bytes against a 2500 byte limit: one file must go
+            total = cleanup_storage(str(public), str(Path(tmpdir) / "evidence"), 2500 / 1024 ** 3)
+            
+            assert total == 2000
+            assert not files[0].exists()
+            assert files[1].exists() and files[2].exists()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -1,16 +1,15 @@
 import cv2
 import os
-from pathlib import Path
 import sys
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config import Config
+from config import get_config
 
 def generate_thumbnails():
-    config = Config()
-    public_path = Path(config.public_path)
+    config = get_config()
+    public_path = config.public_path
     
     if not public_path.exists():
         print(f"Directory not found: {public_path}")